@@ -1,7 +1,9 @@
 #!/usr/bin/env python3.12
-import bitcoin
-from bitcoin.core import x, CoreMainParams
-from bitcoin.wallet import P2PKHBitcoinAddress
+import functools
+import hashlib
+from bitcoin.core import x, CoreMainParams, Hash160
+from bitcoin.core.key import CPubKey
+from bitcoin.wallet import CBitcoinAddressError
 import logging
 
 logger = logging.getLogger(__name__)
@@ -39,10 +41,65 @@ COIN_PARAMS = {
 }
 
 
+B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+# 58**10 < 2**64, so each big-int division yields ten digits that are then split with
+# machine-sized divmods (3 big divisions for a 25-byte address instead of ~34)
+_B58_CHUNK = 58 ** 10
+_B58_CHUNK_DIGITS = 10
+
+
+def b58encode(data):
+    n = int.from_bytes(data, "big")
+    digits = []
+    while n:
+        n, chunk = divmod(n, _B58_CHUNK)
+        for _ in range(_B58_CHUNK_DIGITS):
+            chunk, d = divmod(chunk, 58)
+            digits.append(B58_ALPHABET[d])
+    # Drop zero digits padded onto the most significant chunk
+    while digits and digits[-1] == "1":
+        digits.pop()
+    leading_zeros = len(data) - len(data.lstrip(b"\0"))
+    return "1" * leading_zeros + "".join(reversed(digits))
+
+
+def b58encode_check(version, payload):
+    vs = bytes([version]) + payload
+    check = hashlib.sha256(hashlib.sha256(vs).digest()).digest()[:4]
+    return b58encode(vs + check)
+
+
+def _openssl_ripemd160_available():
+    # OpenSSL 3 only exposes ripemd160 when the build ships it in the default/legacy provider
+    try:
+        hashlib.new("ripemd160", b"")
+        return True
+    except ValueError:
+        return False
+
+
+if _openssl_ripemd160_available():
+    def hash160(data):
+        """RIPEMD160(SHA256(data)), both through OpenSSL."""
+        return hashlib.new("ripemd160", hashlib.sha256(data).digest()).digest()
+else:
+    # bitcoinlib's Hash160 falls back to a pure-Python RIPEMD160
+    hash160 = Hash160
+
+
+@functools.lru_cache(maxsize=65536)
+def _p2pkh_address(version, pubkey):
+    # Pass the version byte explicitly rather than swapping the global bitcoin.params
+    pubkey_bytes = CPubKey(x(pubkey))
+    if not pubkey_bytes.is_fullyvalid:
+        raise CBitcoinAddressError('invalid pubkey')
+    return b58encode_check(version, hash160(pubkey_bytes))
+
+
 def calc_addr_from_pubkey(coin, pubkey):
-    bitcoin.params = COIN_PARAMS[coin]
+    version = COIN_PARAMS[coin].BASE58_PREFIXES['PUBKEY_ADDR']
     try:
-        return str(P2PKHBitcoinAddress.from_pubkey(x(pubkey)))
+        return _p2pkh_address(version, pubkey)
     except Exception as e:
         logger.error(f"[calc_addr_from_pubkey] Exception: {e}")
         return {"error": str(e)}
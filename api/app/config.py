@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import os
 from typing import Optional
 
@@ -44,12 +45,19 @@ class AppConfig(BaseSettings):
 
 	@classmethod
 	def load(cls) -> "AppConfig":
-		# Load .env optionally from ENV_FILE override
-		env_file = os.environ.get("ENV_FILE")
-		if env_file:
-			load_dotenv(env_file)
-		else:
-			load_dotenv()
+		# Load .env optionally from ENV_FILE override; DISABLE_DOTENV=1 skips it for env-only deployments
+		if not os.environ.get("DISABLE_DOTENV"):
+			_load_env_file(os.environ.get("ENV_FILE") or None)
 		return cls()
 
 
+@functools.lru_cache(maxsize=None)
+def _load_env_file(env_file: Optional[str]) -> None:
+	# load_dotenv never overrides variables already in os.environ, so re-reading the
+	# same file on later loads can't change anything; only the first read per path matters.
+	if env_file:
+		load_dotenv(env_file)
+	else:
+		load_dotenv()
+
+
@@ -1,27 +1,108 @@
 from __future__ import annotations
 
 import os
+import queue
 import sqlite3
+import sys
 import threading
 import time
 from contextlib import closing
 from decimal import Decimal
-from typing import Callable, Optional
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 from .models import Swap
 
+# Rows are pulled from sqlite in chunks of this size and handed to the callback as one batch
+FETCH_BATCH_SIZE = 1000
+# Polled batches waiting for the consumer thread; the poller blocks (backpressure) when full
+QUEUE_MAX_BATCHES = 64
+# Most swaps handed to the callback in one call; bounds how long one call holds the store lock
+MAX_DELIVERY_SWAPS = 256
+# Poll error handling: exponential backoff capped at MAX_BACKOFF_SECONDS; the connection is
+# only recycled after RECONNECT_AFTER_ERRORS consecutive failures (or a non-operational error)
+RECONNECT_AFTER_ERRORS = 3
+MAX_BACKOFF_SECONDS = 30
+
+_DECIMAL_ZERO = Decimal("0")
+# How long a blocked put on the full queue waits before re-checking for a stop request
+_ENQUEUE_TIMEOUT_SECONDS = 0.5
+
+
+class _MonitorStopped(Exception):
+	"""Raised inside the poller when stop() is requested between batches or while it waits on a full queue."""
+
+# Statements are module constants so sqlite3's per-connection statement cache
+# (keyed by SQL text) reuses the prepared statement on every poll.
+_SELECT_SWAPS = (
+	"SELECT id, maker_coin, taker_coin, uuid, started_at, finished_at, maker_amount, taker_amount, "
+	"is_success, maker_coin_ticker, maker_coin_platform, taker_coin_ticker, taker_coin_platform, "
+	"maker_coin_usd_price, taker_coin_usd_price, maker_pubkey, taker_pubkey, maker_gui, taker_gui, maker_version, taker_version "
+	"FROM stats_swaps "
+)
+POLL_QUERY = _SELECT_SWAPS + "WHERE id > ? ORDER BY id ASC"
+_LOOKUP_PUBKEYS = (
+	"SELECT maker_coin_ticker, taker_coin_ticker, maker_pubkey, taker_pubkey FROM stats_swaps WHERE uuid = ? LIMIT 1"
+)
+
+# Page cache, mmap and temp storage tuning shared by every sqlite connection the api opens
+SQLITE_CACHE_PRAGMAS = (
+	"PRAGMA cache_size = -65536",
+	"PRAGMA mmap_size = 268435456",
+	"PRAGMA temp_store = MEMORY",
+)
+# Reader-side tuning only: the KDF DB belongs to KDF (and is mounted read-only into the api
+# container), so journal mode, sync level and indexes are left to the writer.
+_READER_PRAGMAS = ("PRAGMA query_only = ON",) + SQLITE_CACHE_PRAGMAS
+
+
+def _to_decimal(value: object, default: Optional[Decimal] = None) -> Optional[Decimal]:
+	# Integer-valued columns convert exactly without the str() round trip; REAL columns go
+	# through str() so the shortest float repr is kept rather than its binary expansion.
+	if value is None:
+		return default
+	if isinstance(value, int):
+		return Decimal(value)
+	return Decimal(str(value))
+
+
+def _to_int(value: object) -> Optional[int]:
+	# Timestamp columns can come back as REAL or TEXT; the store's time indexes need ints
+	if value is None or isinstance(value, int):
+		return value
+	if isinstance(value, float):
+		return int(value)
+	return int(float(str(value)))
+
+
+def _merge_ranges(ranges: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+	merged: List[Tuple[int, int]] = []
+	for start, end in sorted((int(a), int(b)) for a, b in ranges if int(a) <= int(b)):
+		if merged and start <= merged[-1][1]:
+			merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+		else:
+			merged.append((start, end))
+	return merged
+
 
 class SQLiteSwapMonitor:
-	"""Polls a sqlite database for newly completed swaps and pushes them to a callback."""
+	"""Polls a sqlite database for newly completed swaps and pushes them to a callback in batches.
+
+	Each tick first reads `PRAGMA data_version`, which only changes when another connection
+	(KDF) commits, so idle ticks are cheap and the interval can be kept short.
+
+	Polled batches are queued to a consumer thread that coalesces them into bounded callback calls,
+	so the poller's cursor is never held open while the store is busy. Backfills run before
+	start() and call the callback directly.
+	"""
 
 	def __init__(
 		self,
 		db_path: str,
-		callback: Callable[[Swap], None],
-		poll_interval_seconds: float = 2.0,
+		callback: Callable[[List[Swap]], None],
+		poll_interval_seconds: float = 0.5,
 		load_history: bool = True,
 	) -> None:
 		self._db_path = db_path
@@ -30,25 +111,94 @@ class SQLiteSwapMonitor:
 		self._last_seen_id: int = -1
 		self._load_history = load_history
 		self._thread: Optional[threading.Thread] = None
+		self._consumer: Optional[threading.Thread] = None
+		self._queue: "queue.Queue[Optional[List[Swap]]]" = queue.Queue(maxsize=QUEUE_MAX_BATCHES)
 		self._stop_event = threading.Event()
+		# Shared reader for one-off lookups (request threads); opened on first use
+		self._lookup_conn: Optional[sqlite3.Connection] = None
+		self._lookup_lock = threading.Lock()
 
 	def start(self) -> None:
 		if self._thread and self._thread.is_alive():
 			return
 		self._stop_event.clear()
+		self._consumer = threading.Thread(target=self._consume, name="sqlite-swap-consumer", daemon=True)
+		self._consumer.start()
 		self._thread = threading.Thread(target=self._run, name="sqlite-swap-monitor", daemon=True)
 		self._thread.start()
 
 	def stop(self) -> None:
 		self._stop_event.set()
+		# The poller re-checks the stop flag between fetched batches and on every enqueue timeout,
+		# so it normally exits well within the join; the sentinel should only follow its last batch.
+		# The join stays bounded so a slow sqlite read cannot stall shutdown.
 		if self._thread and self._thread.is_alive():
 			self._thread.join(timeout=5)
+			if self._thread.is_alive():
+				logger.warning("Swap monitor poller did not stop within 5s; stopping the consumer anyway")
+		if self._consumer:
+			# Sentinel lets the consumer flush what the poller already queued, then exit
+			while self._consumer.is_alive():
+				try:
+					self._queue.put(None, timeout=_ENQUEUE_TIMEOUT_SECONDS)
+					break
+				except queue.Full:
+					continue
+			self._consumer.join(timeout=5)
+		with self._lookup_lock:
+			if self._lookup_conn is not None:
+				self._lookup_conn.close()
+				self._lookup_conn = None
 
-	def _connect(self) -> sqlite3.Connection:
+	def _consume(self) -> None:
+		while True:
+			batch = self._queue.get()
+			if batch is None:
+				return
+			# Coalesce small queued batches, but never past MAX_DELIVERY_SWAPS per callback call:
+			# the store holds its lock for a whole call, and readers wait on it
+			merged = list(batch)
+			done = False
+			while len(merged) < MAX_DELIVERY_SWAPS:
+				try:
+					more = self._queue.get_nowait()
+				except queue.Empty:
+					break
+				if more is None:
+					done = True
+					break
+				merged.extend(more)
+			for i in range(0, len(merged), MAX_DELIVERY_SWAPS):
+				if not self._deliver(merged[i:i + MAX_DELIVERY_SWAPS]):
+					logger.error(f"Monitor stopping: dropped {len(merged) - i} undelivered swaps")
+					return
+			if done:
+				return
+
+	def _deliver(self, swaps: List[Swap]) -> bool:
+		"""Pass swaps to the callback, retrying until it succeeds. Returns False if stopped first."""
+		# The poller has already moved past these rows, so a failed delivery is retried (with
+		# backoff) rather than dropped; each swap insert is all or nothing, so redelivery is safe.
+		# Only a stop abandons it.
+		attempt = 0
+		while True:
+			try:
+				self._callback(swaps)
+				return True
+			except Exception as e:
+				attempt += 1
+				delay = min(MAX_BACKOFF_SECONDS, 2 ** attempt)
+				logger.error(f"Swap callback failed for {len(swaps)} swaps (attempt {attempt}), retrying in {delay}s: {e}")
+				if self._stop_event.wait(delay):
+					return False
+
+	def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
 		# Use autocommit to ensure read transactions are not held open between polls,
 		# which can block WAL checkpointing in the writer.
-		conn = sqlite3.connect(self._db_path, isolation_level=None)
-		conn.row_factory = sqlite3.Row
+		# Rows stay plain tuples (no sqlite3.Row factory); _row_to_swap unpacks them positionally
+		conn = sqlite3.connect(self._db_path, isolation_level=None, check_same_thread=check_same_thread)
+		for pragma in _READER_PRAGMAS:
+			conn.execute(pragma)
 		return conn
 
 	def _ensure_last_seen(self, conn: sqlite3.Connection) -> None:
@@ -58,93 +208,164 @@ class SQLiteSwapMonitor:
 			else:
 				cur.execute("SELECT COALESCE(MAX(id), -1) AS max_id FROM stats_swaps")
 				row = cur.fetchone()
-				self._last_seen_id = int(row["max_id"]) if row and row["max_id"] is not None else -1
+				self._last_seen_id = int(row[0]) if row and row[0] is not None else -1
+
+	def _data_version(self, conn: sqlite3.Connection) -> int:
+		with closing(conn.cursor()) as cur:
+			cur.execute("PRAGMA data_version")
+			return int(cur.fetchone()[0])
 
 	def _run(self) -> None:
 		# Backoff loop waiting for DB file
 		while not os.path.exists(self._db_path) and not self._stop_event.is_set():
-			time.sleep(1.0)
+			self._stop_event.wait(1.0)
 		if self._stop_event.is_set():
 			return
 
-		with self._connect() as conn:
-			self._ensure_last_seen(conn)
+		conn: Optional[sqlite3.Connection] = None
+		initialized = False
+		seen_version: Optional[int] = None
+		consecutive_errors = 0
+		try:
 			while not self._stop_event.is_set():
 				try:
-					new_last_seen = self._poll_once(conn)
-					if new_last_seen is not None:
-						self._last_seen_id = new_last_seen
-				except Exception:
-					# On error, reopen connection after brief delay
-					try:
-						conn.close()
-					except Exception:
-						pass
-					time.sleep(self._poll_interval_seconds)
-					conn = self._connect()
-				time.sleep(self._poll_interval_seconds)
+					if conn is None:
+						conn = self._connect()
+						if not initialized:
+							self._ensure_last_seen(conn)
+							initialized = True
+					# Read the version before querying so commits landing mid-poll trigger another pass
+					version = self._data_version(conn)
+					if version != seen_version:
+						new_last_seen = self._poll_once(conn)
+						if new_last_seen is not None:
+							self._last_seen_id = new_last_seen
+						seen_version = version
+					consecutive_errors = 0
+				except _MonitorStopped:
+					# _last_seen_id was not advanced, so nothing past the last queued batch is skipped
+					break
+				except Exception as e:
+					consecutive_errors += 1
+					logger.warning(f"Swap monitor poll failed ({consecutive_errors} in a row): {e}")
+					# A locked/busy DB while KDF commits is transient: keep the warm connection and
+					# retry. Other errors, or repeated failures, recycle it.
+					if conn is not None and (consecutive_errors >= RECONNECT_AFTER_ERRORS or not isinstance(e, sqlite3.OperationalError)):
+						try:
+							conn.close()
+						except Exception:
+							pass
+						conn = None
+					seen_version = None
+					self._stop_event.wait(min(MAX_BACKOFF_SECONDS, 2 ** consecutive_errors))
+					continue
+				self._stop_event.wait(self._poll_interval_seconds)
+		finally:
+			if conn is not None:
+				conn.close()
 
 	def _poll_once(self, conn: sqlite3.Connection) -> Optional[int]:
-		query = (
-			"SELECT id, maker_coin, taker_coin, uuid, started_at, finished_at, maker_amount, taker_amount, "
-			"is_success, maker_coin_ticker, maker_coin_platform, taker_coin_ticker, taker_coin_platform, "
-			"maker_coin_usd_price, taker_coin_usd_price, maker_pubkey, taker_pubkey, maker_gui, taker_gui, maker_version, taker_version "
-			"FROM stats_swaps WHERE id > ? ORDER BY id ASC"
-		)
 		with closing(conn.cursor()) as cur:
-			cur.execute(query, (self._last_seen_id,))
-			rows = cur.fetchall()
-			last_id = None
-			for row in rows:
-				last_id = int(row["id"])  # type: ignore
-				swap = self._row_to_swap(row)
-				self._callback(swap)
-			return last_id
-
-	def _row_to_swap(self, row: sqlite3.Row) -> Swap:
-		return Swap(
-			id=int(row["id"]),
-			uuid=str(row["uuid"]),
-			maker_coin=str(row["maker_coin"]),
-			taker_coin=str(row["taker_coin"]),
-			maker_coin_ticker=row["maker_coin_ticker"],
-			maker_coin_platform=row["maker_coin_platform"],
-			taker_coin_ticker=row["taker_coin_ticker"],
-			taker_coin_platform=row["taker_coin_platform"],
-			started_at=row["started_at"],
-			finished_at=row["finished_at"],
-			maker_amount=Decimal(str(row["maker_amount"])) if row["maker_amount"] is not None else Decimal("0"),
-			taker_amount=Decimal(str(row["taker_amount"])) if row["taker_amount"] is not None else Decimal("0"),
-			maker_coin_usd_price=Decimal(str(row["maker_coin_usd_price"])) if row["maker_coin_usd_price"] is not None else None,
-			taker_coin_usd_price=Decimal(str(row["taker_coin_usd_price"])) if row["taker_coin_usd_price"] is not None else None,
-			is_success=bool(row["is_success"]) if row["is_success"] is not None else None,
-			maker_pubkey=row["maker_pubkey"],
-			taker_pubkey=row["taker_pubkey"],
-			maker_gui=row["maker_gui"],
-			taker_gui=row["taker_gui"],
-			maker_version=row["maker_version"],
-			taker_version=row["taker_version"],
+			cur.execute(POLL_QUERY, (self._last_seen_id,))
+			return self._dispatch_batches(cur, self._enqueue)
+
+	def _enqueue(self, batch: List[Swap]) -> None:
+		# Bounded waits keep the poller responsive to stop() while the consumer is behind
+		while True:
+			try:
+				self._queue.put(batch, timeout=_ENQUEUE_TIMEOUT_SECONDS)
+				return
+			except queue.Full:
+				if self._stop_event.is_set():
+					raise _MonitorStopped()
+
+	def _iter_batches(self, cur: sqlite3.Cursor) -> Iterator[List[tuple]]:
+		cur.arraysize = FETCH_BATCH_SIZE
+		while True:
+			rows = cur.fetchmany()
+			if not rows:
+				return
+			yield rows
+
+	def _dispatch_batches(self, cur: sqlite3.Cursor, sink: Callable[[List[Swap]], None]) -> Optional[int]:
+		"""Convert fetched rows chunk by chunk and pass each chunk to sink. Returns max id seen."""
+		last_id = None
+		for rows in self._iter_batches(cur):
+			swaps = [self._row_to_swap(row) for row in rows]
+			sink(swaps)
+			last_id = swaps[-1].id
+			# Checked before the next fetch so a long history read does not hold up stop()
+			if self._stop_event.is_set():
+				raise _MonitorStopped()
+		return last_id
+
+	def _row_to_swap(self, row: tuple) -> Swap:
+		# Column order must match _SELECT_SWAPS
+		(
+			swap_id, maker_coin, taker_coin, uuid, started_at, finished_at, maker_amount, taker_amount,
+			is_success, maker_coin_ticker, maker_coin_platform, taker_coin_ticker, taker_coin_platform,
+			maker_coin_usd_price, taker_coin_usd_price, maker_pubkey, taker_pubkey, maker_gui, taker_gui, maker_version, taker_version,
+		) = row
+		# Rows come from KDF's own schema, so skip pydantic validation and coerce explicitly
+		return Swap.model_construct(
+			id=int(swap_id),
+			uuid=str(uuid),
+			maker_coin=str(maker_coin),
+			taker_coin=str(taker_coin),
+			maker_coin_ticker=maker_coin_ticker,
+			maker_coin_platform=maker_coin_platform,
+			taker_coin_ticker=taker_coin_ticker,
+			taker_coin_platform=taker_coin_platform,
+			started_at=_to_int(started_at),
+			finished_at=_to_int(finished_at),
+			maker_amount=_to_decimal(maker_amount, _DECIMAL_ZERO),
+			taker_amount=_to_decimal(taker_amount, _DECIMAL_ZERO),
+			maker_coin_usd_price=_to_decimal(maker_coin_usd_price),
+			taker_coin_usd_price=_to_decimal(taker_coin_usd_price),
+			is_success=bool(is_success) if is_success is not None else None,
+			# Interned: the same traders recur across swaps and key the pubkey hash cache
+			maker_pubkey=sys.intern(maker_pubkey) if maker_pubkey else maker_pubkey,
+			taker_pubkey=sys.intern(taker_pubkey) if taker_pubkey else taker_pubkey,
+			maker_gui=maker_gui,
+			taker_gui=taker_gui,
+			maker_version=maker_version,
+			taker_version=taker_version,
 		)
 
+	def lookup_swap_pubkeys(self, uuid: str) -> Optional[Tuple[str, str, Optional[str], Optional[str]]]:
+		"""Return (maker_coin_ticker, taker_coin_ticker, maker_pubkey, taker_pubkey) for a swap uuid, or None.
+
+		Uses one warm reader connection shared across callers (serialized by a lock) instead of
+		opening and tuning a new connection per lookup.
+		"""
+		with self._lookup_lock:
+			if self._lookup_conn is None:
+				self._lookup_conn = self._connect(check_same_thread=False)
+			try:
+				return self._lookup_conn.execute(_LOOKUP_PUBKEYS, (uuid,)).fetchone()
+			except sqlite3.DatabaseError:
+				# Drop the connection so the next lookup reconnects (e.g. DB file replaced)
+				self._lookup_conn.close()
+				self._lookup_conn = None
+				raise
+
 	def backfill_range(self, start_ts: int, end_ts: int) -> Optional[int]:
 		"""Load swaps whose finished_at is within [start_ts, end_ts]. Returns max id loaded."""
-		if not os.path.exists(self._db_path):
+		return self.backfill_ranges([(start_ts, end_ts)])
+
+	def backfill_ranges(self, ranges: Iterable[Tuple[int, int]]) -> Optional[int]:
+		"""Load swaps whose finished_at falls in any of the [start, end] ranges with a single query.
+
+		Overlapping ranges are merged first so each swap is delivered once. Returns max id loaded.
+		"""
+		merged = _merge_ranges(ranges)
+		if not merged or not os.path.exists(self._db_path):
 			return None
-		with self._connect() as conn, closing(conn.cursor()) as cur:
-			query = (
-				"SELECT id, maker_coin, taker_coin, uuid, started_at, finished_at, maker_amount, taker_amount, "
-				"is_success, maker_coin_ticker, maker_coin_platform, taker_coin_ticker, taker_coin_platform, "
-				"maker_coin_usd_price, taker_coin_usd_price, maker_pubkey, taker_pubkey, maker_gui, taker_gui, maker_version, taker_version "
-				"FROM stats_swaps WHERE finished_at BETWEEN ? AND ? ORDER BY id ASC"
-			)
-			cur.execute(query, (int(start_ts), int(end_ts)))
-			rows = cur.fetchall()
-			last_id = None
-			for row in rows:
-				s = self._row_to_swap(row)
-				self._callback(s)
-				last_id = int(row["id"])  # type: ignore
-			return last_id
+		query = _SELECT_SWAPS + "WHERE " + " OR ".join(["finished_at BETWEEN ? AND ?"] * len(merged)) + " ORDER BY id ASC"
+		params = [ts for r in merged for ts in r]
+		with closing(self._connect()) as conn, closing(conn.cursor()) as cur:
+			cur.execute(query, params)
+			return self._dispatch_batches(cur, self._callback)
 
 	def backfill_last_hours(self, hours: int) -> Optional[int]:
 		end_ts = int(time.time())
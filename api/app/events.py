@@ -2,8 +2,13 @@ from __future__ import annotations
 
 import json
 import os
-from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+import sys
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, FrozenSet, Tuple
+
+
+# Keys consumed by the grouped schema; everything else is passed through in Event.extra
+_CORE_KEYS = frozenset({"start", "stop", "base_coin", "rel_coins"})
 
 
 @dataclass
@@ -14,13 +19,26 @@ class Event:
 	base_coin: str
 	rel_coin: str
 	extra: Dict[str, Any]
+	# Upper-cased coins, computed once for comparisons against normalized swap symbols
+	base_symbol: str = field(init=False, repr=False, compare=False)
+	rel_symbol: str = field(init=False, repr=False, compare=False)
+	# Both orderings of the upper-cased pair, so matching is a single set lookup
+	_pairs: FrozenSet[Tuple[str, str]] = field(init=False, repr=False, compare=False)
+	# Swap store bucket keys ("MAKER|TAKER") for the pair, base first then rel first
+	pair_keys: Tuple[str, str] = field(init=False, repr=False, compare=False)
+
+	def __post_init__(self) -> None:
+		b = self.base_symbol = sys.intern(self.base_coin.upper())
+		r = self.rel_symbol = sys.intern(self.rel_coin.upper())
+		self._pairs = frozenset({(b, r), (r, b)})
+		self.pair_keys = (f"{b}|{r}", f"{r}|{b}")
 
 	def matches_pair(self, coin_a: str, coin_b: str) -> bool:
-		ca = coin_a.upper()
-		cb = coin_b.upper()
-		b = self.base_coin.upper()
-		r = self.rel_coin.upper()
-		return (ca == b and cb == r) or (ca == r and cb == b)
+		return (coin_a.upper(), coin_b.upper()) in self._pairs
+
+	def matches_symbols(self, symbol_a: str, symbol_b: str) -> bool:
+		"""matches_pair for already upper-cased symbols (e.g. Swap.maker_symbol)."""
+		return (symbol_a, symbol_b) in self._pairs
 
 
 def load_events(path: Optional[str]) -> List[Event]:
@@ -54,7 +72,7 @@ def load_events(path: Optional[str]) -> List[Event]:
 			if not rel_coins:
 				continue
 			# Build extra payload, excluding core keys and including group metadata
-			extra = {k: v for k, v in details.items() if k not in {"start", "stop", "base_coin", "rel_coins"}}
+			extra = {k: v for k, v in details.items() if k not in _CORE_KEYS}
 			extra["group_name"] = str(group_name)
 			extra["rel_coins"] = rel_coins
 			for rel in rel_coins:
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import functools
+import heapq
+import itertools
+import operator
 import os
-from typing import Optional, Dict, List
+import random
+import re
+from typing import Callable, Iterable, Optional, Dict, List, Tuple
 import time
 import asyncio
 import sys
@@ -10,15 +16,15 @@ import logging
 from fastapi import Depends, FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
 import hmac
 import hashlib
-from fastapi.responses import JSONResponse
-from dataclasses import dataclass
+from fastapi.responses import ORJSONResponse, Response
+import orjson
+from dataclasses import dataclass, field
 from contextlib import asynccontextmanager
 from pydantic import BaseModel, Field, field_validator
 from .config import AppConfig
 from .insight_api import InsightAPI
 from .registration import RegistrationRepo
-from .based58 import calc_addr_from_pubkey
-from bitcoin.core import Hash160, x, b2x
+from .based58 import calc_addr_from_pubkey, hash160
 def _configure_logging() -> None:
 	root = logging.getLogger()
 	if not root.handlers:
@@ -32,7 +38,7 @@ _configure_logging()
 
 from .db_monitor import SQLiteSwapMonitor
 from .models import Swap
-from .store import SwapStore
+from .store import SwapStore, pubkey_search_filter
 from .events import load_events
 from .prices import CoinConfig, PriceCache
 import logging
@@ -54,6 +60,75 @@ class RegisterResponse(BaseModel):
 	registration_address: str
 	registration_amount: float
 
+@functools.lru_cache(maxsize=8)
+def _keyed_hash_state(secret: bytes):
+	# HMAC-SHA256 with the configured key, plain SHA-256 without one; callers copy() it
+	return hmac.new(secret, digestmod=hashlib.sha256) if secret else hashlib.sha256()
+
+
+def _hash_value(secret: bytes, value: str) -> str:
+	"""Hex digest of one pubkey, uncached: for client-supplied input."""
+	h = _keyed_hash_state(secret).copy()
+	h.update(value.encode("utf-8"))
+	return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=65536)
+def _hash_pubkey(secret: bytes, value: str) -> str:
+	"""Memoized _hash_value for pubkeys taken from stored swaps, since the same traders recur
+	across swaps and requests. Never pass raw request input here; it would fill the cache."""
+	return _hash_value(secret, value)
+
+
+def _hash_pubkeys(secret: bytes, values: Iterable[Optional[str]]) -> List[Optional[str]]:
+	"""Hash a batch of pubkeys, mapping missing ones to None."""
+	return [_hash_pubkey(secret, v) if v else None for v in values]
+
+
+_USD_TOTAL_VALUE = operator.attrgetter("usd_total_value")
+
+# Splits comma-separated group names, stripping whitespace around each name in the same pass
+_GROUP_NAME_SPLIT = re.compile(r"\s*,\s*")
+
+# /traders ranking cache bounds: cached (events, search) combinations, and how many traders
+# past the requested page are ranked on a miss
+_TRADERS_CACHE_SIZE = 64
+_TRADERS_RANK_AHEAD = 250
+
+_EVENT_FILTERS = frozenset(("complete", "active", "upcoming"))
+
+_HEALTHZ_BODY = orjson.dumps({"ok": True})
+
+
+@dataclass(slots=True)
+class _PairAgg:
+	"""One pair of a trader's /traders totals, summed over the selected events."""
+	event_base_coin: str
+	event_rel_coin: str
+	base_coin_volume: float = 0.0
+	rel_coin_volume: float = 0.0
+	usd_base_value: float = 0.0
+	usd_rel_value: float = 0.0
+	usd_total_value: float = 0.0
+	trades_as_maker: int = 0
+	trades_as_taker: int = 0
+	trades_total: int = 0
+	# None only for pairs templated in for display
+	last_finished_at: Optional[int] = 0
+
+
+@dataclass(slots=True)
+class _TraderAgg:
+	"""A trader's /traders totals across the selected events."""
+	pubkey: str
+	trades_as_maker: int = 0
+	trades_as_taker: int = 0
+	trades_total: int = 0
+	last_finished_at: int = 0
+	usd_total_value: float = 0.0
+	pairs: Dict[str, _PairAgg] = field(default_factory=dict)
+
+
 @dataclass
 class AppState:
 	# Simple holder for app state
@@ -64,7 +139,7 @@ class AppState:
 
 
 def create_app() -> FastAPI:
-	app = FastAPI(title="Swap Tracker API", version="0.1.0")
+	app = FastAPI(title="Swap Tracker API", version="0.1.0", default_response_class=ORJSONResponse)
 
 	# Centralized config
 	config = AppConfig.load()
@@ -77,25 +152,19 @@ def create_app() -> FastAPI:
 	price_cache = PriceCache(coin_cfg)
 	price_cache.start()
 	store.set_price_cache(price_cache)
-	monitor = SQLiteSwapMonitor(db_path=db_path, callback=lambda s: store.upsert_swap(s), load_history=config.kdf_load_history)
+	monitor = SQLiteSwapMonitor(db_path=db_path, callback=store.upsert_swaps, load_history=config.kdf_load_history)
     
-	# Backfill since given timestamp or last 24 hours to make stats available on launch
+	# Load events from JSON path
+	loaded_events = load_events(config.events_json_path)
+	store.set_events(loaded_events)
+
+	# Backfill since given timestamp (or the last hour) plus every event window in one query
+	now_ts = int(time.time())
+	backfill_start = int(config.backfill_since) if config.backfill_since is not None else now_ts - 3600
 	try:
-		if config.backfill_since is not None:
-			monitor.backfill_range(int(config.backfill_since), int(time.time()))
-		else:
-			monitor.backfill_last_hours(1)
+		monitor.backfill_ranges([(backfill_start, now_ts)] + [(ev.start, ev.stop) for ev in loaded_events])
 	except Exception:
 		pass
-
-	# Load events from JSON path and backfill their windows
-	loaded_events = load_events(config.events_json_path)
-	store.set_events(loaded_events)
-	for ev in loaded_events:
-		try:
-			monitor.backfill_range(ev.start, ev.stop)
-		except Exception:
-			pass
 	monitor.start()
 
 	# Registration components
@@ -105,50 +174,82 @@ def create_app() -> FastAPI:
 
 	state = AppState(store=store, monitor=monitor, reg_repo=reg_repo, insight=insight)
 	app.state.swap_state = state  # type: ignore[attr-defined]
+	# Key for the public pubkey hashes, encoded once for the module-level hashing helpers
+	app.state.pubkey_secret = (config.pubkey_hash_key or "").encode("utf-8")  # type: ignore[attr-defined]
 
 	# Periodic pruning task: keep last 24h (configurable) and protect event windows
 	store.set_retention_hours(config.retention_hours)
 
-	async def _pruner() -> None:
-		while True:
-			store.prune(int(time.time()))
-			await asyncio.sleep(60)
+	# Pruning runs as a plain loop callback rescheduled with call_later; the handle is kept so
+	# shutdown can cancel it. The prune itself runs on a worker thread so a large eviction
+	# never stalls the event loop.
+	prune_handle: List[Optional[asyncio.TimerHandle]] = [None]
+	prune_stopped = [False]
+
+	def _prune_tick() -> None:
+		fut = asyncio.get_running_loop().run_in_executor(None, store.prune)
+		fut.add_done_callback(_prune_done)
+
+	def _prune_done(fut: asyncio.Future) -> None:
+		if not fut.cancelled() and fut.exception() is not None:
+			logger.error(f"Prune failed: {fut.exception()}")
+		if prune_stopped[0]:
+			return
+		# Wake when the oldest prunable swap expires, checking at least once a minute; the
+		# sub-second jitter keeps ticks from lining up with other periodic work
+		now = time.time()
+		due = store.next_expiry()
+		delay = 60 if due is None else min(60, max(1, due - now))
+		prune_handle[0] = asyncio.get_running_loop().call_later(delay + random.random(), _prune_tick)
 
 	@asynccontextmanager
 	async def lifespan(app: FastAPI):
 		# Start background tasks
-		pruner_task = asyncio.create_task(_pruner())
+		_prune_tick()
 		reg_task = asyncio.create_task(_registration_watcher())
 		try:
 			yield
 		finally:
 			# Stop tasks and monitor cleanly
-			for t in (pruner_task, reg_task):
-				try:
-					t.cancel()
-				except Exception:
-					pass
+			prune_stopped[0] = True
+			if prune_handle[0] is not None:
+				prune_handle[0].cancel()
 			try:
-				await asyncio.gather(pruner_task, reg_task, return_exceptions=True)
+				reg_task.cancel()
+			except Exception:
+				pass
+			try:
+				await asyncio.gather(reg_task, return_exceptions=True)
 			except Exception:
 				pass
 			try:
 				state.monitor.stop()
 			except Exception:
 				pass
+			try:
+				state.insight.close()
+			except Exception:
+				pass
+			try:
+				state.reg_repo.close()
+			except Exception:
+				pass
 	# Attach lifespan handler
 	app.router.lifespan_context = lifespan  # type: ignore[attr-defined]
 
-	def get_store() -> SwapStore:
+	# Dependencies and the in-memory endpoints below are async: they never block on I/O, so they
+	# run on the event loop instead of taking a threadpool hop. Endpoints that touch sqlite or do
+	# heavy per-request work stay sync.
+	async def get_store() -> SwapStore:
 		return app.state.swap_state.store  # type: ignore[attr-defined]
-	def get_reg_repo() -> RegistrationRepo:
+	async def get_reg_repo() -> RegistrationRepo:
 		return app.state.swap_state.reg_repo  # type: ignore[attr-defined]
-	def get_insight() -> InsightAPI:
+	async def get_insight() -> InsightAPI:
 		return app.state.swap_state.insight  # type: ignore[attr-defined]
 
 	@app.get("/healthz")
-	def healthz() -> dict:
-		return {"ok": True}
+	async def healthz():
+		return Response(content=_HEALTHZ_BODY, media_type="application/json")
 
 	@app.get("/players")
 	def players(reg_repo: RegistrationRepo = Depends(get_reg_repo)) -> Dict[str, str]:
@@ -158,23 +259,20 @@ def create_app() -> FastAPI:
 	# Registration endpoint
 
 	def _lookup_swap_pubkeys(uuid: str) -> dict:
-		# Query the same sqlite DB used by the monitor
-		import sqlite3
-		from contextlib import closing
-		with sqlite3.connect(config.kdf_db_path, isolation_level=None) as conn, closing(conn.cursor()) as cur:
-			cur.execute(
-				"SELECT maker_coin_ticker, taker_coin_ticker, maker_pubkey, taker_pubkey FROM stats_swaps WHERE uuid = ? LIMIT 1",
-				(uuid,),
-			)
-			row = cur.fetchone()
-			if not row:
-				raise HTTPException(status_code=404, detail="swap uuid not found")
-			return {
-				"maker_coin_ticker": row[0],
-				"taker_coin_ticker": row[1],
-				"maker_pubkey": row[2],
-				"taker_pubkey": row[3],
-			}
+		# Swaps already ingested are answered from memory; older ones from the monitor's shared reader
+		s = store.get_swap(uuid)
+		if s is not None:
+			row = (s.maker_coin_ticker, s.taker_coin_ticker, s.maker_pubkey, s.taker_pubkey)
+		else:
+			row = monitor.lookup_swap_pubkeys(uuid)
+		if not row:
+			raise HTTPException(status_code=404, detail="swap uuid not found")
+		return {
+			"maker_coin_ticker": row[0],
+			"taker_coin_ticker": row[1],
+			"maker_pubkey": row[2],
+			"taker_pubkey": row[3],
+		}
 
 	def _pubkey_for_kmd_address(kmd_address: str, maker_pubkey: Optional[str], taker_pubkey: Optional[str]) -> Optional[str]:
 		for pk in [maker_pubkey, taker_pubkey]:
@@ -189,16 +287,9 @@ def create_app() -> FastAPI:
 
 	def _hash160_hex_from_pubkey(pubkey_hex: str) -> str:
 		try:
-			return b2x(Hash160(x(pubkey_hex)))
+			return hash160(bytes.fromhex(pubkey_hex)).hex()
 		except Exception:
-			# Fallback: SHA256 then RIPEMD160 via hashlib if available
-			try:
-				import hashlib as _hl
-				sha = _hl.sha256(bytes.fromhex(pubkey_hex)).digest()
-				rip = _hl.new("ripemd160", sha).hexdigest()
-				return rip
-			except Exception:
-				raise HTTPException(status_code=500, detail="failed to compute pubkey_hash")
+			raise HTTPException(status_code=500, detail="failed to compute pubkey_hash")
 
 	@app.post("/register", response_model=RegisterResponse)
 	def register(req: RegisterRequest, reg_repo: RegistrationRepo = Depends(get_reg_repo)) -> RegisterResponse:
@@ -207,7 +298,6 @@ def create_app() -> FastAPI:
 		if not rego_addr:
 			raise HTTPException(status_code=500, detail="registration address not configured")
 		# Pick random fee
-		import random
 		min_amt = float(config.registration_amount_min)
 		max_amt = float(config.registration_amount_max)
 		fee = round(random.uniform(min_amt, max_amt), 3)
@@ -231,41 +321,15 @@ def create_app() -> FastAPI:
 		return RegisterResponse(registration_address=rego_addr, registration_amount=fee)
 
 	@app.get("/swap/{uuid}")
-	def get_swap(uuid: str, store: SwapStore = Depends(get_store)):
+	async def get_swap(uuid: str, store: SwapStore = Depends(get_store)):
 		s = store.get_swap(uuid)
 		if not s:
 			raise HTTPException(status_code=404, detail="swap not found")
-		secret = (config.pubkey_hash_key).encode("utf-8")
-		def _hash_pubkey(value: Optional[str]) -> Optional[str]:
-			if not value:
-				return None
-			if not secret:
-				return hashlib.sha256(value.encode("utf-8")).hexdigest()
-			return hmac.new(secret, value.encode("utf-8"), hashlib.sha256).hexdigest()
-		payload = {**s.dict()}
-		maker_hash = _hash_pubkey(payload.get("maker_pubkey"))
-		taker_hash = _hash_pubkey(payload.get("taker_pubkey"))
-		payload.pop("maker_pubkey", None)
-		payload.pop("taker_pubkey", None)
-		payload.update({
-			"maker_pubkey_hash": maker_hash,
-			"taker_pubkey_hash": taker_hash,
-		})
-		return payload
+		maker_hash, taker_hash = _hash_pubkeys(app.state.pubkey_secret, (s.maker_pubkey, s.taker_pubkey))
+		return ORJSONResponse(s.to_public_dict(maker_hash, taker_hash))
 
 	# Proposed endpoints per issue
-	# /event_details?event_name=...
-	@app.get("/event_details")
-	def event_details(event_name: str) -> dict:
-		# Return group-level details for requested event (group name)
-		all_events = app.state.swap_state.store.get_events()  # type: ignore[attr-defined]
-		groups: Dict[str, List] = {}
-		for ev in all_events:
-			g = str(ev.extra.get("group_name") or ev.name)
-			groups.setdefault(g, []).append(ev)
-		events_for_group = groups.get(str(event_name))
-		if not events_for_group:
-			return {"error": f"event `{event_name}` not found"}
+	def _event_details_payload(event_name: str, events_for_group: List) -> dict:
 		# Assume common start/stop across group; compute defensively
 		start_ts = min(int(e.start) for e in events_for_group)
 		stop_ts = max(int(e.stop) for e in events_for_group)
@@ -286,355 +350,296 @@ def create_app() -> FastAPI:
 			}
 		}
 
+	# (groups, names body, name -> details body); rebuilt only when set_events replaces the groups
+	event_views: List[tuple] = [({}, b"[]", {})]
+
+	def _event_views(groups: Dict[str, List]) -> tuple:
+		views = event_views[0]
+		if views[0] is not groups:
+			details = {name: orjson.dumps(_event_details_payload(name, lst)) for name, lst in groups.items() if lst}
+			views = (groups, orjson.dumps(list(groups.keys())), details)
+			event_views[0] = views
+		return views
+
+	# /event_details?event_name=...
+	@app.get("/event_details")
+	async def event_details(event_name: str):
+		# Return group-level details for requested event (group name), pre-serialized per group
+		groups = app.state.swap_state.store.get_event_groups()  # type: ignore[attr-defined]
+		body = _event_views(groups)[2].get(str(event_name))
+		if body is None:
+			return {"error": f"event `{event_name}` not found"}
+		return Response(content=body, media_type="application/json")
+
 	@app.get("/events")
-	def events(filter: Optional[str] = Query(None, description="Optional status filter: complete | active | upcoming")) -> dict:
+	async def events(filter: Optional[str] = Query(None, description="Optional status filter: complete | active | upcoming")):
 		# Return GROUP event names, optionally filtered by status relative to current time
-		all_events = app.state.swap_state.store.get_events()  # type: ignore[attr-defined]
-		groups: Dict[str, List] = {}
-		for ev in all_events:
-			g = str(ev.extra.get("group_name") or ev.name)
-			groups.setdefault(g, []).append(ev)
-		now_ts = int(time.time())
-		def _group_window(name: str) -> tuple:
-			lst = groups[name]
-			return (min(int(e.start) for e in lst), max(int(e.stop) for e in lst))
-		group_names = list(groups.keys())
-		if filter:
-			flt = str(filter).lower().strip()
-			if flt not in {"complete", "active", "upcoming"}:
-				raise HTTPException(status_code=400, detail="invalid filter; must be one of: complete, active, upcoming")
-			def _include(name: str) -> bool:
-				start_ts, stop_ts = _group_window(name)
-				if flt == "complete":
-					return stop_ts < now_ts
-				if flt == "active":
-					return start_ts <= now_ts <= stop_ts
-				return start_ts > now_ts  # upcoming
-			group_names = [n for n in group_names if _include(n)]
-		return JSONResponse(group_names)
+		if not filter:
+			groups = app.state.swap_state.store.get_event_groups()  # type: ignore[attr-defined]
+			return Response(content=_event_views(groups)[1], media_type="application/json")
+		flt = str(filter).lower().strip()
+		if flt not in _EVENT_FILTERS:
+			raise HTTPException(status_code=400, detail="invalid filter; must be one of: complete, active, upcoming")
+		group_names = app.state.swap_state.store.group_names_by_status(int(time.time()))[flt]  # type: ignore[attr-defined]
+		return ORJSONResponse(group_names)
 
 	# /hash_pubkey?pubkey=...
 	@app.get("/hash_pubkey")
-	def hash_pubkey(pubkey: str = Query(...)) -> dict:
-		secret = (config.pubkey_hash_key).encode("utf-8")
-		if not secret:
-			return {"pubkey_hash": hashlib.sha256(pubkey.encode("utf-8")).hexdigest()}
-		return {"pubkey_hash": hmac.new(secret, pubkey.encode("utf-8"), hashlib.sha256).hexdigest()}
+	async def hash_pubkey(pubkey: str = Query(...)) -> dict:
+		# Arbitrary client input: hashed without going through the pubkey cache
+		return {"pubkey_hash": _hash_value(app.state.pubkey_secret, pubkey)}
 
 	# /identify?uuid=...&ticker=...
 	@app.get("/identify")
-	def identify(uuid: str = Query(...), ticker: str = Query(...), store: SwapStore = Depends(get_store)) -> dict:
+	async def identify(uuid: str = Query(...), ticker: str = Query(...), store: SwapStore = Depends(get_store)) -> dict:
 		s = store.get_swap(uuid)
 		if not s:
 			raise HTTPException(status_code=404, detail="swap not found")
 		target = str(ticker).upper()
-		secret = (config.pubkey_hash_key).encode("utf-8")
-		def _hash_pubkey(value: Optional[str]) -> str:
-			if not value:
-				raise HTTPException(status_code=404, detail="pubkey not found for ticker")
-			if not secret:
-				return hashlib.sha256(value.encode("utf-8")).hexdigest()
-			return hmac.new(secret, value.encode("utf-8"), hashlib.sha256).hexdigest()
-		if s.maker_coin_ticker and s.maker_coin_ticker.upper() == target:
-			return {"pubkey_hash": _hash_pubkey(s.maker_pubkey)}
-		if s.taker_coin_ticker and s.taker_coin_ticker.upper() == target:
-			return {"pubkey_hash": _hash_pubkey(s.taker_pubkey)}
-		raise HTTPException(status_code=400, detail="ticker not part of swap")
+		pubkeys = s.ticker_pubkeys
+		if target not in pubkeys:
+			raise HTTPException(status_code=400, detail="ticker not part of swap")
+		value = pubkeys[target]
+		if not value:
+			raise HTTPException(status_code=404, detail="pubkey not found for ticker")
+		return {"pubkey_hash": _hash_pubkey(app.state.pubkey_secret, value)}
 
 	# /traders?event_name=...&limit=50&offset=0&search=
-	@app.get("/traders")
-	def traders(
-		event_name: str = Query(..., description="Group name or comma-separated list of group names"),
-		limit: int = Query(50, ge=1, le=500),
-		offset: int = Query(0, ge=0),
-		search: Optional[str] = Query(None),
-		verbose: bool = Query(True, description="Verbose output"),
-	):
-		logger.info(f"Traders request: {event_name} {limit} {offset} {search}")
-		all_events = app.state.swap_state.store.get_events()  # type: ignore[attr-defined]
-		# Build group -> events mapping
-		groups: Dict[str, List] = {}
-		for ev in all_events:
-			g = str(ev.extra.get("group_name") or ev.name)
-			groups.setdefault(g, []).append(ev)
-		requested_groups = [n.strip() for n in str(event_name).split(",") if n.strip()]
+	def _select_groups(event_name: str):
+		"""Events of the requested comma-separated groups, plus the requested names not found."""
+		groups = app.state.swap_state.store.get_event_groups()  # type: ignore[attr-defined]
 		selected: List = []
 		missing: List[str] = []
-		for g in requested_groups:
+		for g in _GROUP_NAME_SPLIT.split(str(event_name).strip()):
+			if not g:
+				continue
 			lst = groups.get(g)
 			if not lst:
 				missing.append(g)
 				continue
 			selected.extend(lst)
-		if not selected:
-			return {"error": f"event `{event_name}` not found"}
-		if missing:
-			return {"error": f"event `{','.join(missing)}` not found"}
+		return selected, missing
 
-		secret = (config.pubkey_hash_key).encode("utf-8")
-		def _hash_pubkey(value: Optional[str]) -> Optional[str]:
-			if not value:
-				return None
-			if not secret:
-				return hashlib.sha256(value.encode("utf-8")).hexdigest()
-			return hmac.new(secret, value.encode("utf-8"), hashlib.sha256).hexdigest()
+	# /traders rankings: (event names, search) -> (stamp, ranked prefix, prefix is complete)
+	traders_cache: Dict[tuple, tuple] = {}
 
+	def _ranked_traders(selected: List, search: Optional[str], depth: int) -> Tuple[List[_TraderAgg], bool]:
+		"""The top `depth` traders of the selected events by USD total, and whether that is all of them."""
+		# A single event's ranking is final, so the store only needs to build the rows up to depth
+		top_k = depth if len(selected) == 1 else None
 		# Build per-pubkey totals and per-pair breakdowns
-		per_trader: dict = {}
-		# Track the full set of selected pairs so we can template missing ones later
-		all_pair_keys = {}
+		per_trader: Dict[str, _TraderAgg] = {}
 		for ev in selected:
 			pair_key = f"{ev.base_coin}/{ev.rel_coin}"
-			all_pair_keys[pair_key] = (ev.base_coin, ev.rel_coin)
-			rows = store.aggregate_trader_metrics(ev, ev.start, ev.stop, price_cache, pubkey_search=search)
+			rows = store.aggregate_trader_metrics(ev, ev.start, ev.stop, price_cache, pubkey_search=search, top_k=top_k)
+			# Store rows are fully typed (non-empty pubkey, ints and floats), so merge them directly
 			for r in rows:
-				pk = r.get("pubkey")
-				if not pk:
-					continue
-				rec = per_trader.setdefault(pk, {
-					"pubkey": pk,
-					"trades_as_maker": 0,
-					"trades_as_taker": 0,
-					"trades_total": 0,
-					"last_finished_at": 0,
-					"usd_total_value": 0.0,
-					"pairs": {},
-				})
+				pk = r["pubkey"]
+				rec = per_trader.get(pk)
+				if rec is None:
+					rec = per_trader[pk] = _TraderAgg(pk)
 				# Update root totals
-				rec["trades_as_maker"] += int(r.get("trades_as_maker") or 0)
-				rec["trades_as_taker"] += int(r.get("trades_as_taker") or 0)
-				rec["trades_total"] += int(r.get("trades_total") or 0)
-				rec["last_finished_at"] = max(int(rec.get("last_finished_at") or 0), int(r.get("last_finished_at") or 0))
-				rec["usd_total_value"] += float(r.get("usd_total_value") or 0.0)
+				rec.trades_as_maker += r["trades_as_maker"]
+				rec.trades_as_taker += r["trades_as_taker"]
+				rec.trades_total += r["trades_total"]
+				if r["last_finished_at"] > rec.last_finished_at:
+					rec.last_finished_at = r["last_finished_at"]
+				rec.usd_total_value += r["usd_total_value"]
 				# Update per-pair breakdown (aggregate if same pair appears in multiple events)
-				p = rec["pairs"].setdefault(pair_key, {
-					"event_base_coin": ev.base_coin,
-					"event_rel_coin": ev.rel_coin,
-					"base_coin_volume": 0.0,
-					"rel_coin_volume": 0.0,
-					"usd_base_value": 0.0,
-					"usd_rel_value": 0.0,
-					"usd_total_value": 0.0,
-					"trades_as_maker": 0,
-					"trades_as_taker": 0,
-					"trades_total": 0,
-					"last_finished_at": 0,
-				})
-				p["base_coin_volume"] += float(r.get("base_coin_volume") or 0.0)
-				p["rel_coin_volume"] += float(r.get("rel_coin_volume") or 0.0)
-				p["usd_base_value"] += float(r.get("usd_base_value") or 0.0)
-				p["usd_rel_value"] += float(r.get("usd_rel_value") or 0.0)
-				p["usd_total_value"] += float(r.get("usd_total_value") or 0.0)
-				p["trades_as_maker"] += int(r.get("trades_as_maker") or 0)
-				p["trades_as_taker"] += int(r.get("trades_as_taker") or 0)
-				p["trades_total"] += int(r.get("trades_total") or 0)
-				p["last_finished_at"] = max(int(p.get("last_finished_at") or 0), int(r.get("last_finished_at") or 0))
-
-		# Template missing pairs for each trader with zeroed stats and cached prices
+				p = rec.pairs.get(pair_key)
+				if p is None:
+					p = rec.pairs[pair_key] = _PairAgg(ev.base_coin, ev.rel_coin)
+				p.base_coin_volume += r["base_coin_volume"]
+				p.rel_coin_volume += r["rel_coin_volume"]
+				p.usd_base_value += r["usd_base_value"]
+				p.usd_rel_value += r["usd_rel_value"]
+				p.usd_total_value += r["usd_total_value"]
+				p.trades_as_maker += r["trades_as_maker"]
+				p.trades_as_taker += r["trades_as_taker"]
+				p.trades_total += r["trades_total"]
+				if r["last_finished_at"] > p.last_finished_at:
+					p.last_finished_at = r["last_finished_at"]
+
+		# Rank by combined USD total value across all traders
 		for rec in per_trader.values():
-			pairs_map = rec["pairs"]
-			for pair_key, (b_coin, r_coin) in all_pair_keys.items():
-				if pair_key in pairs_map:
-					# If existing entry has no derived prices, fill with cache values
-					entry = pairs_map[pair_key]
-					if entry.get("usd_base_price") is None:
-						entry["usd_base_price"] = price_cache.get_price_usd(b_coin)
-					if entry.get("usd_rel_price") is None:
-						entry["usd_rel_price"] = price_cache.get_price_usd(r_coin)
-					continue
-				pairs_map[pair_key] = {
-					"event_base_coin": b_coin,
-					"event_rel_coin": r_coin,
-					"base_coin_volume": 0.0,
-					"rel_coin_volume": 0.0,
-					"usd_base_value": 0.0,
-					"usd_rel_value": 0.0,
-					"usd_total_value": 0.0,
-					"trades_as_maker": 0,
-					"trades_as_taker": 0,
-					"trades_total": 0,
-					"last_finished_at": None,
-					"usd_base_price": price_cache.get_price_usd(b_coin),
-					"usd_rel_price": price_cache.get_price_usd(r_coin),
-				}
-
-		# Finalize: compute ranks and pubkey hashes; compute per-pair avg prices
-		rows = []
-		for pk, rec in per_trader.items():
-			# Compute derived per-pair prices
-			pairs_detail = {}
-			for k, v in rec["pairs"].items():
-				base_vol = float(v.get("base_coin_volume") or 0.0)
-				rel_vol = float(v.get("rel_coin_volume") or 0.0)
-				base_val = float(v.get("usd_base_value") or 0.0)
-				rel_val = float(v.get("usd_rel_value") or 0.0)
-				# Prefer derived average; if no volume, fall back to existing entry value or cache
-				b_coin = v.get("event_base_coin")
-				r_coin = v.get("event_rel_coin")
-				usd_base_price = (base_val / base_vol) if base_vol else (v.get("usd_base_price") if v.get("usd_base_price") is not None else (price_cache.get_price_usd(b_coin) if b_coin else None))
-				usd_rel_price = (rel_val / rel_vol) if rel_vol else (v.get("usd_rel_price") if v.get("usd_rel_price") is not None else (price_cache.get_price_usd(r_coin) if r_coin else None))
-				pairs_detail[k] = {
-					**v,
-					"usd_base_price": usd_base_price,
-					"usd_rel_price": usd_rel_price,
-					"usd_total_value": round(v.get("usd_total_value") or 0.0, 2),
-					"usd_base_value": round(v.get("usd_base_value") or 0.0, 2),
-					"usd_rel_value": round(v.get("usd_rel_value") or 0.0, 2),
-				}
-			if verbose:
-				pairs_out = pairs_detail
-			else:
-				pairs_out = [k for k in pairs_detail.keys()]
-			rec["usd_total_value"] = round(rec["usd_total_value"], 2)
-			rows.append({
-				"pubkey": pk,
-				"trades_as_maker": rec.get("trades_as_maker"),
-				"trades_as_taker": rec.get("trades_as_taker"),
-				"trades_total": rec.get("trades_total"),
-				"last_finished_at": rec.get("last_finished_at"),
-				"usd_total_value": rec.get("usd_total_value"),
-				"pairs": pairs_out,
-			})
+			rec.usd_total_value = round(rec.usd_total_value, 2)
+		# nlargest keeps sorted(..., reverse=True) tie order but only heap-selects the first pages
+		return heapq.nlargest(depth, per_trader.values(), key=_USD_TOTAL_VALUE), len(per_trader) < depth
+
+	@app.get("/traders")
+	def traders(
+		event_name: str = Query(..., description="Group name or comma-separated list of group names"),
+		limit: int = Query(50, ge=1, le=500),
+		offset: int = Query(0, ge=0),
+		search: Optional[str] = Query(None),
+		verbose: bool = Query(True, description="Verbose output"),
+	):
+		logger.info(f"Traders request: {event_name} {limit} {offset} {search}")
+		selected, missing = _select_groups(event_name)
+		if not selected:
+			return {"error": f"event `{event_name}` not found"}
+		if missing:
+			return {"error": f"event `{','.join(missing)}` not found"}
 
-		# Rank by combined USD total value
-		sorted_for_rank = sorted(rows, key=lambda r: float(r.get("usd_total_value") or 0.0), reverse=True)
-		pubkey_to_rank = {r.get("pubkey"): idx + 1 for idx, r in enumerate(sorted_for_rank)}
-		for r in rows:
-			r["rank"] = pubkey_to_rank.get(r.get("pubkey"))
-		# Sort and paginate
-		rows.sort(key=lambda r: int(r.get("rank") or 0))
-		sliced = rows[offset:offset+limit]
+		# Track the full set of selected pairs so we can template missing ones later; cache prices
+		# are looked up once per pair, not once per (trader, pair)
+		all_pair_keys = {f"{ev.base_coin}/{ev.rel_coin}": (ev.base_coin, ev.rel_coin) for ev in selected}
+		pair_prices = {k: (price_cache.get_price_usd(b), price_cache.get_price_usd(r)) for k, (b, r) in all_pair_keys.items()}
+
+		# A ranking only changes when a swap lands in one of the events or a cache price it was
+		# valued with moves; until then pages are slices of the cached ranking
+		need = offset + limit
+		cache_key = (tuple(ev.name for ev in selected), search)
+		stamp = (tuple(store.event_version(ev.name) for ev in selected), tuple(pair_prices.values()))
+		cached = traders_cache.get(cache_key)
+		if cached is not None and cached[0] == stamp and (cached[2] or need <= len(cached[1])):
+			ranked = cached[1]
+		else:
+			# Rank a little past this page so paging forward stays on the cached prefix
+			ranked, complete = _ranked_traders(selected, search, need + _TRADERS_RANK_AHEAD)
+			if len(traders_cache) >= _TRADERS_CACHE_SIZE:
+				traders_cache.clear()
+			traders_cache[cache_key] = (stamp, ranked, complete)
+		# Everything below is only built for the requested page; cached records are not mutated
+		page = ranked[offset:need]
+		hashes = _hash_pubkeys(app.state.pubkey_secret, [rec.pubkey for rec in page])
 
-		# Hash pubkeys and remove raw pubkey field
 		annotated = []
-		for r in sliced:
-			pubkey = r.get("pubkey")
-			h = _hash_pubkey(pubkey)
-			out = {k: v for k, v in r.items() if k != "pubkey"}
-			out.update({"pubkey_hash": h})
-			annotated.append(out)
-		return annotated
+		for rank, (rec, pubkey_hash) in enumerate(zip(page, hashes), start=offset + 1):
+			pairs_map = rec.pairs
+			# Missing pairs are templated with zeroed stats
+			missing_pairs = [k for k in all_pair_keys if k not in pairs_map]
+			if verbose:
+				# Derived per-pair prices: the traded average, or the cache price when there is no volume
+				pairs_detail = {}
+				templated = ((k, _PairAgg(*all_pair_keys[k], last_finished_at=None)) for k in missing_pairs)
+				for k, p in itertools.chain(pairs_map.items(), templated):
+					b_price, r_price = pair_prices[k]
+					pairs_detail[k] = {
+						"event_base_coin": p.event_base_coin,
+						"event_rel_coin": p.event_rel_coin,
+						"base_coin_volume": p.base_coin_volume,
+						"rel_coin_volume": p.rel_coin_volume,
+						"usd_base_value": round(p.usd_base_value, 2),
+						"usd_rel_value": round(p.usd_rel_value, 2),
+						"usd_total_value": round(p.usd_total_value, 2),
+						"trades_as_maker": p.trades_as_maker,
+						"trades_as_taker": p.trades_as_taker,
+						"trades_total": p.trades_total,
+						"last_finished_at": p.last_finished_at,
+						"usd_base_price": (p.usd_base_value / p.base_coin_volume) if p.base_coin_volume else b_price,
+						"usd_rel_price": (p.usd_rel_value / p.rel_coin_volume) if p.rel_coin_volume else r_price,
+					}
+			annotated.append({
+				"trades_as_maker": rec.trades_as_maker,
+				"trades_as_taker": rec.trades_as_taker,
+				"trades_total": rec.trades_total,
+				"last_finished_at": rec.last_finished_at,
+				"usd_total_value": rec.usd_total_value,
+				"pairs": pairs_detail if verbose else list(pairs_map) + missing_pairs,
+				"rank": rank,
+				"pubkey_hash": pubkey_hash,
+			})
+		return ORJSONResponse(annotated)
 
 	# /trader_swaps?event_name=...&pubkey=...&limit=50&offset=0&search=
 	@app.get("/trader_swaps")
 	def trader_swaps(event_name: str = Query(..., description="Group name or comma-separated list of group names"), pubkey: Optional[str] = Query(None), limit: int = Query(50, ge=1, le=500), offset: int = Query(0, ge=0), search: Optional[str] = Query(None)):
-		all_events = app.state.swap_state.store.get_events()  # type: ignore[attr-defined]
-		groups: Dict[str, List] = {}
-		for ev in all_events:
-			g = str(ev.extra.get("group_name") or ev.name)
-			groups.setdefault(g, []).append(ev)
-		requested_groups = [n.strip() for n in str(event_name).split(",") if n.strip()]
-		selected: List = []
-		missing: List[str] = []
-		for g in requested_groups:
-			lst = groups.get(g)
-			if not lst:
-				missing.append(g)
-				continue
-			selected.extend(lst)
+		selected, missing = _select_groups(event_name)
 		if not selected:
 			return {"error": f"event `{event_name}` not found"}
 		if missing:
 			return {"error": f"event `{','.join(missing)}` not found"}
 
-		secret = (config.pubkey_hash_key).encode("utf-8")
-		def _hash_pubkey(value: Optional[str]) -> Optional[str]:
-			if not value:
-				return None
-			if not secret:
-				return hashlib.sha256(value.encode("utf-8")).hexdigest()
-			return hmac.new(secret, value.encode("utf-8"), hashlib.sha256).hexdigest()
+		secret = app.state.pubkey_secret
+		needle_raw_or_hash = str(pubkey) if pubkey else None
 
-		def _matches_swap_pubkey_field(s_pub: Optional[str], needle_raw_or_hash: str) -> bool:
-			if not s_pub:
-				return False
-			return s_pub == needle_raw_or_hash or _hash_pubkey(s_pub) == needle_raw_or_hash
+		def _filtered_event_swaps(ev) -> List[Swap]:
+			# Resolve filters against the event's distinct traders (hashing each pubkey once)
+			# and fetch their swaps from the store's per-event pubkey index.
+			if needle_raw_or_hash is None:
+				return store.swaps_for_event_pair(ev, ev.start, ev.stop, pubkey_search=search)
+			candidates = store.event_pubkeys(ev)
+			hashes = _hash_pubkeys(secret, candidates)
+			matched = [pk for pk, h in zip(candidates, hashes) if pk == needle_raw_or_hash or h == needle_raw_or_hash]
+			swaps = store.swaps_for_event_pubkeys(ev, matched)
+			if search:
+				swaps = list(filter(pubkey_search_filter(search), swaps))
+			return swaps
 
-		def _row_for_event(s: Swap, ev) -> dict:
+		def _event_row_builder(ev) -> Callable[[Swap], dict]:
+			# Per-event constants are resolved once, not once per swap row
+			# Coin -> side index (0 base, 1 rel); base wins if an event pairs a coin with itself
+			sides = {ev.rel_symbol: 1, ev.base_symbol: 0}
 			b_price = price_cache.get_price_usd(ev.base_coin)
 			r_price = price_cache.get_price_usd(ev.rel_coin)
-			base_vol = 0.0
-			rel_vol = 0.0
-			if s.maker_coin_ticker.upper() == ev.base_coin.upper():
-				base_vol += float(str(s.maker_amount))
-			elif s.maker_coin_ticker.upper() == ev.rel_coin.upper():
-				rel_vol += float(str(s.maker_amount))
-			if s.taker_coin_ticker.upper() == ev.base_coin.upper():
-				base_vol += float(str(s.taker_amount))
-			elif s.taker_coin_ticker.upper() == ev.rel_coin.upper():
-				rel_vol += float(str(s.taker_amount))
-			swap_base_price = None
-			swap_rel_price = None
-			if s.maker_coin_ticker and s.maker_coin_ticker.upper() == ev.base_coin.upper() and s.maker_coin_usd_price is not None:
-				swap_base_price = float(s.maker_coin_usd_price)
-			elif s.taker_coin_ticker and s.taker_coin_ticker.upper() == ev.base_coin.upper() and s.taker_coin_usd_price is not None:
-				swap_base_price = float(s.taker_coin_usd_price)
-			if s.maker_coin_ticker and s.maker_coin_ticker.upper() == ev.rel_coin.upper() and s.maker_coin_usd_price is not None:
-				swap_rel_price = float(s.maker_coin_usd_price)
-			elif s.taker_coin_ticker and s.taker_coin_ticker.upper() == ev.rel_coin.upper() and s.taker_coin_usd_price is not None:
-				swap_rel_price = float(s.taker_coin_usd_price)
-			usd_base_value = base_vol * (swap_base_price if swap_base_price is not None else (b_price or 0.0))
-			usd_rel_value = rel_vol * (swap_rel_price if swap_rel_price is not None else (r_price or 0.0))
-			payload = {**s.dict()}
-			maker_hash = _hash_pubkey(s.maker_pubkey)
-			taker_hash = _hash_pubkey(s.taker_pubkey)
-			if "maker_pubkey" in payload:
-				payload.pop("maker_pubkey", None)
-			if "taker_pubkey" in payload:
-				payload.pop("taker_pubkey", None)
-			payload.update({
-				"maker_pubkey_hash": maker_hash,
-				"taker_pubkey_hash": taker_hash,
-				"usd_base_price": swap_base_price if swap_base_price is not None else b_price,
-				"usd_rel_price": swap_rel_price if swap_rel_price is not None else r_price,
-				"usd_base_value": usd_base_value,
-				"usd_rel_value": usd_rel_value,
-				"usd_total_value": usd_base_value + usd_rel_value,
+			event_fields = {
 				"event_base_coin": ev.base_coin,
 				"event_rel_coin": ev.rel_coin,
 				"pair": f"{ev.base_coin}/{ev.rel_coin}",
 				"event_name": ev.name,
-			})
-			return payload
+			}
+
+			def _row(s: Swap) -> dict:
+				# Each side is classified once by its upper-cased ticker; the first
+				# recorded swap price for a coin (maker first) wins over the cache price.
+				vols = [0.0, 0.0]
+				prices: List[Optional[float]] = [None, None]
+				for coin, amount, price in ((s.maker_ticker_upper, s.maker_amount_float, s.maker_usd_price_float), (s.taker_ticker_upper, s.taker_amount_float, s.taker_usd_price_float)):
+					side = sides.get(coin)
+					if side is None:
+						continue
+					vols[side] += amount
+					if prices[side] is None and price is not None:
+						prices[side] = price
+				usd_base_price = prices[0] if prices[0] is not None else b_price
+				usd_rel_price = prices[1] if prices[1] is not None else r_price
+				usd_base_value = vols[0] * (usd_base_price or 0.0)
+				usd_rel_value = vols[1] * (usd_rel_price or 0.0)
+				maker_hash, taker_hash = _hash_pubkeys(secret, (s.maker_pubkey, s.taker_pubkey))
+				payload = s.to_public_dict(maker_hash, taker_hash)
+				payload.update({
+					"usd_base_price": usd_base_price,
+					"usd_rel_price": usd_rel_price,
+					"usd_base_value": usd_base_value,
+					"usd_rel_value": usd_rel_value,
+					"usd_total_value": usd_base_value + usd_rel_value,
+				})
+				payload.update(event_fields)
+				return payload
 
+			return _row
+
+		# Rows are only built for the requested page; filtering and ordering work on swaps
 		# Single event: preserve original behavior
 		if len(selected) == 1:
 			ev = selected[0]
-			swaps = store.swaps_for_event_pair(ev, ev.start, ev.stop)
-			if search:
-				needle = search.lower()
-				swaps = [s for s in swaps if (s.maker_pubkey and needle in s.maker_pubkey.lower()) or (s.taker_pubkey and needle in s.taker_pubkey.lower())]
-			if pubkey:
-				needle_raw_or_hash = str(pubkey)
-				swaps = [s for s in swaps if _matches_swap_pubkey_field(s.maker_pubkey, needle_raw_or_hash) or _matches_swap_pubkey_field(s.taker_pubkey, needle_raw_or_hash)]
-			swaps_sorted = sorted(swaps, key=lambda s: int(s.finished_at or 0), reverse=True)
-			rows = [_row_for_event(s, ev) for s in swaps_sorted]
-			return rows[offset:offset+limit]
-
-		# Multiple events: gather, annotate with originating event, dedupe by uuid
-		rows_all: dict = {}
-		needle_lower = search.lower() if search else None
-		needle_raw_or_hash = str(pubkey) if pubkey else None
-		for ev in selected:
-			swaps = store.swaps_for_event_pair(ev, ev.start, ev.stop)
-			if needle_lower:
-				swaps = [s for s in swaps if (s.maker_pubkey and needle_lower in s.maker_pubkey.lower()) or (s.taker_pubkey and needle_lower in s.taker_pubkey.lower())]
-			if needle_raw_or_hash is not None:
-				swaps = [s for s in swaps if _matches_swap_pubkey_field(s.maker_pubkey, needle_raw_or_hash) or _matches_swap_pubkey_field(s.taker_pubkey, needle_raw_or_hash)]
-			for s in swaps:
-				row = _row_for_event(s, ev)
-				if s.uuid not in rows_all:
-					rows_all[s.uuid] = row
-				else:
-					# Keep the one with the latest finished_at
-					prev = rows_all[s.uuid]
-					prev_ts = int(prev.get("finished_at") or 0)
-					cur_ts = int(row.get("finished_at") or 0)
-					if cur_ts > prev_ts:
-						rows_all[s.uuid] = row
-		rows_list = list(rows_all.values())
-		rows_sorted = sorted(rows_list, key=lambda r: int(r.get("finished_at") or 0), reverse=True)
-		return rows_sorted[offset:offset+limit]
+			# The store already returns event swaps newest first
+			swaps = _filtered_event_swaps(ev)
+			row_for = _event_row_builder(ev)
+			return ORJSONResponse([row_for(s) for s in swaps[offset:offset+limit]])
+
+		# Multiple events: every event's swaps come back newest first, so merge the streams
+		# lazily and stop once the page is full, deduping by uuid (first originating event wins)
+		streams = [zip(_filtered_event_swaps(ev), itertools.repeat(ev)) for ev in selected]
+		seen: set = set()
+		page = []
+		for s, ev in heapq.merge(*streams, key=lambda item: int(item[0].finished_at or 0), reverse=True):
+			if s.uuid in seen:
+				continue
+			seen.add(s.uuid)
+			if len(seen) > offset:
+				page.append((s, ev))
+				if len(seen) >= offset + limit:
+					break
+		row_builders: Dict[str, Callable[[Swap], dict]] = {}
+		rows = []
+		for s, ev in page:
+			row_for = row_builders.get(ev.name)
+			if row_for is None:
+				row_for = row_builders[ev.name] = _event_row_builder(ev)
+			rows.append(row_for(s))
+		return ORJSONResponse(rows)
 
 	# Removed legacy stats endpoints; new event-based endpoints will be added below
 
@@ -645,6 +650,52 @@ def create_app() -> FastAPI:
 		poll_seconds = max(10, int(config.registration_poll_seconds))
 		expiry_seconds = max(60, int(config.registration_expiry_hours) * 3600)
 		rego_addr = (config.registration_doc_address or "").strip()
+		# Insight lookups are blocking HTTP calls: run them off the event loop, a bounded
+		# number at a time, so one poll costs about ceil(N / 8) round trips instead of N
+		insight_slots = asyncio.Semaphore(8)
+
+		async def _check_pending(ru) -> None:
+			# Derive candidate DOC address from pubkey
+			doc_from_addr = calc_addr_from_pubkey("DOC", ru.pubkey)
+			if isinstance(doc_from_addr, dict) and doc_from_addr.get("error"):
+				logger.error(f"Address derivation failed for {ru.address}: {doc_from_addr}")
+				return
+			async with insight_slots:
+				try:
+					resp = await asyncio.to_thread(insight.addresses_transactions, addresses=rego_addr, from_=doc_from_addr)
+				except Exception as e:
+					logger.error(f"Insight call failed: {e}")
+					return
+			try:
+				items = (resp or {}).get("items") or []
+			except Exception:
+				items = []
+			# Find any confirmed tx paying exactly the rego_fee (3dp)
+			matched_txid: Optional[str] = None
+			for it in items:
+				confirmations = int(it.get("confirmations") or 0)
+				if confirmations <= 0:
+					continue
+				# Sum outputs to rego_addr
+				total_to_rego = 0.0
+				for vout in it.get("vout") or []:
+					addrs = (vout.get("scriptPubKey") or {}).get("addresses") or []
+					if rego_addr in addrs:
+						try:
+							total_to_rego += float(vout.get("value"))
+						except Exception:
+							pass
+				# Compare at 3dp
+				if round(total_to_rego, 3) == round(float(ru.rego_fee), 3):
+					matched_txid = str(it.get("txid"))
+					break
+			if matched_txid:
+				try:
+					reg_repo.set_registered(address=ru.address, txid=matched_txid)
+					logger.info(f"Registered {ru.address} via tx {matched_txid}")
+				except Exception as e:
+					logger.error(f"Failed to mark registered for {ru.address}: {e}")
+
 		while True:
 			try:
 				# Skip if not configured
@@ -658,48 +709,12 @@ def create_app() -> FastAPI:
 						logger.info(f"Expired {expired} pending registrations")
 				except Exception as e:
 					logger.error(f"Expire old registrations failed: {e}")
-				# Process pendings
+				# Process pendings concurrently
 				pending = reg_repo.list_pending()
-				for ru in pending:
-					# Derive candidate DOC address from pubkey
-					doc_from_addr = calc_addr_from_pubkey("DOC", ru.pubkey)
-					if isinstance(doc_from_addr, dict) and doc_from_addr.get("error"):
-						logger.error(f"Address derivation failed for {ru.address}: {doc_from_addr}")
-						continue
-					try:
-						resp = insight.addresses_transactions(addresses=rego_addr, from_=doc_from_addr)
-					except Exception as e:
-						logger.error(f"Insight call failed: {e}")
-						continue
-					try:
-						items = (resp or {}).get("items") or []
-					except Exception:
-						items = []
-					# Find any confirmed tx paying exactly the rego_fee (3dp)
-					matched_txid: Optional[str] = None
-					for it in items:
-						confirmations = int(it.get("confirmations") or 0)
-						if confirmations <= 0:
-							continue
-						# Sum outputs to rego_addr
-						total_to_rego = 0.0
-						for vout in it.get("vout") or []:
-							addrs = (vout.get("scriptPubKey") or {}).get("addresses") or []
-							if rego_addr in addrs:
-								try:
-									total_to_rego += float(vout.get("value"))
-								except Exception:
-									pass
-						# Compare at 3dp
-						if round(total_to_rego, 3) == round(float(ru.rego_fee), 3):
-							matched_txid = str(it.get("txid"))
-							break
-					if matched_txid:
-						try:
-							reg_repo.set_registered(address=ru.address, txid=matched_txid)
-							logger.info(f"Registered {ru.address} via tx {matched_txid}")
-						except Exception as e:
-							logger.error(f"Failed to mark registered for {ru.address}: {e}")
+				results = await asyncio.gather(*(_check_pending(ru) for ru in pending), return_exceptions=True)
+				for res in results:
+					if isinstance(res, Exception):
+						logger.error(f"Registration check failed: {res}")
 			except Exception as outer:
 				logger.error(f"Registration watcher error: {outer}")
 			await asyncio.sleep(poll_seconds)
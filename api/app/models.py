@@ -1,13 +1,41 @@
 from __future__ import annotations
 
+import sys
 from decimal import Decimal
-from typing import Optional
+from functools import cached_property
+from typing import Any, Dict, Mapping, Optional
 
-from pydantic import BaseModel, Field
+from fastapi.encoders import decimal_encoder
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic import field_serializer
 
 
+def normalize_ticker(ticker: Optional[str]) -> Optional[str]:
+	"""Upper-case and intern a coin ticker so hot loops compare it without re-casing."""
+	return sys.intern(ticker.upper()) if ticker else ticker
+
+
+def normalize_symbol(coin_symbol: Optional[str], coin_ticker: Optional[str]) -> str:
+	"""Prefer ticker if available; otherwise strip platform suffixes like -segwit from symbol.
+
+	This ensures keys like KMD|DGB match even when DB symbol is DGB-segwit.
+	"""
+	if coin_ticker and str(coin_ticker).strip():
+		return str(coin_ticker).upper()
+	# Fallback: remove suffix after '-' (e.g., DGB-segwit -> DGB)
+	base = (coin_symbol or "").split("-")[0]
+	return base.upper()
+
+
+def _json_decimal(value: Optional[Decimal]):
+	# Same int/float choice FastAPI's jsonable_encoder makes for Decimal
+	return decimal_encoder(value) if value is not None else None
+
+
 class Swap(BaseModel):
+	# Instances are shared by every store index, so they are immutable once built
+	model_config = ConfigDict(frozen=True)
+
 	# Core identifiers
 	id: int
 	uuid: str
@@ -48,6 +76,102 @@ class Swap(BaseModel):
 		except Exception:
 			return float(str(v))
 
+	# Normalized coin symbols (see normalize_symbol), resolved once per swap for the store indexes
+	@cached_property
+	def maker_symbol(self) -> str:
+		return normalize_symbol(self.maker_coin, self.maker_coin_ticker)
+
+	@cached_property
+	def taker_symbol(self) -> str:
+		return normalize_symbol(self.taker_coin, self.taker_coin_ticker)
+
+	# Upper-cased, interned tickers (see normalize_ticker) for hot-loop comparisons; the fields
+	# themselves keep the ticker as recorded
+	@cached_property
+	def maker_ticker_upper(self) -> Optional[str]:
+		return normalize_ticker(self.maker_coin_ticker)
+
+	@cached_property
+	def taker_ticker_upper(self) -> Optional[str]:
+		return normalize_ticker(self.taker_coin_ticker)
+
+	@cached_property
+	def ticker_pubkeys(self) -> Dict[str, Optional[str]]:
+		"""Upper-cased ticker -> pubkey of the side trading it (maker wins if both sides share a ticker)."""
+		out: Dict[str, Optional[str]] = {}
+		if self.taker_ticker_upper:
+			out[self.taker_ticker_upper] = self.taker_pubkey
+		if self.maker_ticker_upper:
+			out[self.maker_ticker_upper] = self.maker_pubkey
+		return out
+
+	# Amounts and recorded USD prices as floats, converted once per swap for the FP64 volume/USD math
+	@cached_property
+	def maker_amount_float(self) -> float:
+		return float(self.maker_amount)
+
+	@cached_property
+	def taker_amount_float(self) -> float:
+		return float(self.taker_amount)
+
+	@cached_property
+	def maker_usd_price_float(self) -> Optional[float]:
+		return float(self.maker_coin_usd_price) if self.maker_coin_usd_price is not None else None
+
+	@cached_property
+	def taker_usd_price_float(self) -> Optional[float]:
+		return float(self.taker_coin_usd_price) if self.taker_coin_usd_price is not None else None
+
+	@cached_property
+	def _public_fields(self) -> dict:
+		# Pubkey-independent part of to_public_dict(), built once per swap (safe since frozen)
+		return {
+			"id": self.id,
+			"uuid": self.uuid,
+			"maker_coin": self.maker_coin,
+			"taker_coin": self.taker_coin,
+			"maker_coin_ticker": self.maker_coin_ticker,
+			"maker_coin_platform": self.maker_coin_platform,
+			"taker_coin_ticker": self.taker_coin_ticker,
+			"taker_coin_platform": self.taker_coin_platform,
+			"started_at": self.started_at,
+			"finished_at": self.finished_at,
+			"maker_amount": _json_decimal(self.maker_amount),
+			"taker_amount": _json_decimal(self.taker_amount),
+			"maker_coin_usd_price": _json_decimal(self.maker_coin_usd_price),
+			"taker_coin_usd_price": _json_decimal(self.taker_coin_usd_price),
+			"is_success": self.is_success,
+			"maker_gui": self.maker_gui,
+			"taker_gui": self.taker_gui,
+			"maker_version": self.maker_version,
+			"taker_version": self.taker_version,
+		}
+
+	def to_public_dict(self, maker_pubkey_hash: Optional[str], taker_pubkey_hash: Optional[str]) -> dict:
+		"""JSON-ready fields in model order, with raw pubkeys replaced by their hashes.
+
+		Returns a fresh shallow copy of the cached public fields, so callers may add keys to it.
+		"""
+		payload = dict(self._public_fields)
+		payload["maker_pubkey_hash"] = maker_pubkey_hash
+		payload["taker_pubkey_hash"] = taker_pubkey_hash
+		return payload
+
+	def model_copy(self, *, update: Optional[Mapping[str, Any]] = None, deep: bool = False) -> "Swap":
+		"""Copy as pydantic does, minus the cached derived values.
+
+		Those live in the instance __dict__, which pydantic copies as is, so the copy would
+		otherwise keep values derived from the original fields; they are recomputed on access.
+		"""
+		copied = super().model_copy(update=update, deep=deep)
+		for name in _SWAP_CACHED_PROPERTIES:
+			copied.__dict__.pop(name, None)
+		return copied
+
+
+# Names of Swap's cached_property values (everything derived from the fields)
+_SWAP_CACHED_PROPERTIES = tuple(name for name, value in vars(Swap).items() if isinstance(value, cached_property))
+
 
 class TotalCount(BaseModel):
 	total: int
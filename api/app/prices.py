@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-import json
 import os
 import threading
 import time
-from typing import Dict, Optional, Set
+from typing import Dict, Optional, Set, Tuple
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 class CoinConfig:
@@ -20,8 +22,8 @@ class CoinConfig:
 		# Prefer local path if provided; else fetch from Komodo coins repo raw URL
 		local_path = os.environ.get("COIN_CONFIG_PATH")
 		if local_path and os.path.exists(local_path):
-			with open(local_path, "r") as f:
-				data = json.load(f)
+			with open(local_path, "rb") as f:
+				data = orjson.loads(f.read())
 			return cls(_extract_symbol_to_id(data))
 		url = os.environ.get(
 			"COIN_CONFIG_URL",
@@ -30,7 +32,7 @@ class CoinConfig:
 		try:
 			resp = requests.get(url, timeout=15)
 			resp.raise_for_status()
-			data = resp.json()
+			data = orjson.loads(resp.content)
 			return cls(_extract_symbol_to_id(data))
 		except Exception:
 			return cls({})
@@ -55,10 +57,21 @@ class PriceCache:
 		self._config = coin_config
 		self._refresh_seconds = refresh_seconds
 		self._lock = threading.RLock()
+		# Replaced wholesale on each refresh and never mutated after publishing, so readers use
+		# whichever dict they load without taking the lock
 		self._symbol_prices: Dict[str, float] = {}
 		self._symbols_needed: Set[str] = set()
+		# Bumped whenever a symbol is added to _symbols_needed
+		self._symbols_version: int = 0
+		# (symbols version, symbol -> CoinGecko id, query URL) from the last refresh; rebuilt only
+		# when the needed symbols change
+		self._query: Optional[Tuple[int, Dict[str, str], str]] = None
 		self._stop = threading.Event()
 		self._thread: Optional[threading.Thread] = None
+		# Kept for the cache's lifetime so each refresh reuses the keep-alive connection (and its
+		# TLS session); transient connection errors are retried with a short backoff
+		self._session = requests.Session()
+		self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=Retry(total=3, backoff_factor=0.2)))
 
 	def start(self) -> None:
 		if self._thread and self._thread.is_alive():
@@ -71,17 +84,25 @@ class PriceCache:
 		self._stop.set()
 		if self._thread and self._thread.is_alive():
 			self._thread.join(timeout=5)
+		self._session.close()
 
 	def register_symbols(self, symbols: Set[str]) -> None:
+		needed = self._symbols_needed
+		missing = [s.upper() for s in symbols if s.upper() not in needed]
+		if not missing:
+			# Already tracked (the usual case): no lock round trip
+			return
 		with self._lock:
-			for s in symbols:
-				self._symbols_needed.add(s.upper())
+			for sym in missing:
+				if sym not in self._symbols_needed:
+					self._symbols_needed.add(sym)
+					self._symbols_version += 1
 
 	def get_price_usd(self, symbol: str) -> Optional[float]:
-		with self._lock:
-			if symbol.upper() not in self._symbols_needed:
-				self._symbols_needed.add(symbol.upper())
-			return self._symbol_prices.get(symbol.upper())
+		sym = symbol.upper()
+		if sym not in self._symbols_needed:
+			self.register_symbols({sym})
+		return self._symbol_prices.get(sym)
 
 	def _run(self) -> None:
 		while not self._stop.is_set():
@@ -93,28 +114,34 @@ class PriceCache:
 
 	def _refresh_once(self) -> None:
 		with self._lock:
-			symbols = sorted(self._symbols_needed)
-		if not symbols:
-			return
-		# Map symbols to CoinGecko IDs
-		ids: Dict[str, str] = {}
-		for sym in symbols:
-			cid = self._config.get_coingecko_id(sym)
-			if cid:
-				ids[sym] = cid
+			version = self._symbols_version
+			query = self._query
+			symbols = sorted(self._symbols_needed) if query is None or query[0] != version else None
+		if symbols is not None:
+			# Map symbols to CoinGecko IDs
+			ids: Dict[str, str] = {}
+			for sym in symbols:
+				cid = self._config.get_coingecko_id(sym)
+				if cid:
+					ids[sym] = cid
+			query_ids = ",".join(sorted(set(ids.values())))
+			query = (version, ids, f"https://api.coingecko.com/api/v3/simple/price?ids={query_ids}&vs_currencies=usd")
+			self._query = query
+		_, ids, url = query
 		if not ids:
 			return
-		query_ids = ",".join(sorted(set(ids.values())))
-		url = f"https://api.coingecko.com/api/v3/simple/price?ids={query_ids}&vs_currencies=usd"
-		resp = requests.get(url, timeout=15)
+		resp = self._session.get(url, timeout=15)
 		resp.raise_for_status()
-		data = resp.json()
+		data = orjson.loads(resp.content)
 		new_prices: Dict[str, float] = {}
 		for sym, cid in ids.items():
 			price = data.get(cid, {}).get("usd")
 			if isinstance(price, (int, float)):
 				new_prices[sym.upper()] = float(price)
 		with self._lock:
-			self._symbol_prices.update(new_prices)
+			# Symbols missing from this response keep their last known price
+			prices = dict(self._symbol_prices)
+			prices.update(new_prices)
+			self._symbol_prices = prices
 
 
@@ -1,14 +1,48 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
 import time
-from contextlib import closing
+from contextlib import closing, contextmanager
 from dataclasses import dataclass
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 import logging
 
+from .db_monitor import SQLITE_CACHE_PRAGMAS
+
 logger = logging.getLogger(__name__)
 
+# Module constants, so the connection's statement cache reuses them (see db_monitor)
+SQL_GET_BY_ADDRESS = "SELECT * FROM registered_users WHERE address = ?"
+SQL_MONIKER_IN_USE = "SELECT 1 FROM registered_users WHERE moniker = ? AND status IN ('pending','registered') LIMIT 1"
+SQL_MONIKER_IN_USE_IGNORE = (
+	"SELECT 1 FROM registered_users WHERE moniker = ? AND address != ? AND status IN ('pending','registered') LIMIT 1"
+)
+# Insert a new pending registration, or refresh the address's row in place if it has expired.
+# A pending/registered row is left untouched and RETURNING yields nothing.
+SQL_UPSERT_PENDING = """
+	INSERT INTO registered_users (moniker, address, pubkey, pubkey_hash, rego_fee, rego_uuid, rego_transaction, status, last_update)
+	VALUES (?, ?, ?, ?, ?, ?, NULL, 'pending', ?)
+	ON CONFLICT(address) DO UPDATE SET
+		moniker = excluded.moniker, pubkey = excluded.pubkey, pubkey_hash = excluded.pubkey_hash, rego_fee = excluded.rego_fee,
+		rego_uuid = excluded.rego_uuid, rego_transaction = NULL, status = 'pending', last_update = excluded.last_update
+	WHERE registered_users.status = 'expired'
+	RETURNING *
+"""
+SQL_STATUS_BY_ADDRESS = "SELECT status FROM registered_users WHERE address = ?"
+SQL_LIST_PENDING = "SELECT * FROM registered_users WHERE status = 'pending' ORDER BY last_update ASC"
+SQL_EXPIRE_OLD = "UPDATE registered_users SET status = 'expired', last_update = ? WHERE status = 'pending' AND last_update < ?"
+SQL_SET_REGISTERED = (
+	"UPDATE registered_users SET rego_transaction = ?, status = 'registered', last_update = ? WHERE address = ? AND status = 'pending'"
+)
+SQL_LIST_PLAYERS = "SELECT moniker, pubkey_hash FROM registered_users WHERE status = 'registered' ORDER BY moniker ASC"
+# Applied once when the shared connection is opened. WAL lets readers proceed during a write and,
+# with synchronous=NORMAL, commits skip the per-transaction fsync (still crash-safe for the app).
+SQL_CONNECTION_PRAGMAS = (
+	"PRAGMA journal_mode=WAL",
+	"PRAGMA synchronous=NORMAL",
+) + SQLITE_CACHE_PRAGMAS
+
 
 @dataclass
 class RegisteredUser:
@@ -25,16 +59,40 @@ class RegisteredUser:
 
 
 class RegistrationRepo:
+	"""sqlite-backed registrations, served from one long-lived autocommit connection.
+
+	The connection is opened on first use and shared by the request threads and the
+	registration watcher; a re-entrant lock serializes access to it.
+	"""
+
 	def __init__(self, db_path: str) -> None:
 		self._db_path = db_path
+		self._conn: Optional[sqlite3.Connection] = None
+		self._lock = threading.RLock()
 
 	def _connect(self) -> sqlite3.Connection:
-		conn = sqlite3.connect(self._db_path, isolation_level=None)
+		conn = sqlite3.connect(self._db_path, isolation_level=None, check_same_thread=False)
 		conn.row_factory = sqlite3.Row
+		for pragma in SQL_CONNECTION_PRAGMAS:
+			conn.execute(pragma)
 		return conn
 
+	@contextmanager
+	def _cursor(self) -> Iterator[sqlite3.Cursor]:
+		with self._lock:
+			if self._conn is None:
+				self._conn = self._connect()
+			with closing(self._conn.cursor()) as cur:
+				yield cur
+
+	def close(self) -> None:
+		with self._lock:
+			if self._conn is not None:
+				self._conn.close()
+				self._conn = None
+
 	def ensure_schema(self) -> None:
-		with self._connect() as conn, closing(conn.cursor()) as cur:
+		with self._cursor() as cur:
 			cur.execute(
 				"""
 				CREATE TABLE IF NOT EXISTS registered_users (
@@ -70,87 +128,65 @@ class RegistrationRepo:
 		)
 
 	def get_by_address(self, address: str) -> Optional[RegisteredUser]:
-		with self._connect() as conn, closing(conn.cursor()) as cur:
-			cur.execute("SELECT * FROM registered_users WHERE address = ?", (address,))
+		with self._cursor() as cur:
+			cur.execute(SQL_GET_BY_ADDRESS, (address,))
 			row = cur.fetchone()
 			return self._row_to_model(row) if row else None
 
 	def moniker_in_use(self, moniker: str, ignore_address: Optional[str] = None) -> bool:
-		with self._connect() as conn, closing(conn.cursor()) as cur:
+		with self._cursor() as cur:
 			if ignore_address:
-				cur.execute(
-					"SELECT 1 FROM registered_users WHERE moniker = ? AND address != ? AND status IN ('pending','registered') LIMIT 1",
-					(moniker, ignore_address),
-				)
+				cur.execute(SQL_MONIKER_IN_USE_IGNORE, (moniker, ignore_address))
 			else:
-				cur.execute(
-					"SELECT 1 FROM registered_users WHERE moniker = ? AND status IN ('pending','registered') LIMIT 1",
-					(moniker,),
-				)
+				cur.execute(SQL_MONIKER_IN_USE, (moniker,))
 			return cur.fetchone() is not None
 
 	def create_or_refresh_pending(self, *, moniker: str, address: str, pubkey: str, pubkey_hash: str, rego_fee: float, rego_uuid: str) -> RegisteredUser:
 		now_ts = int(time.time())
-		with self._connect() as conn, closing(conn.cursor()) as cur:
-			existing: Optional[sqlite3.Row] = None
-			cur.execute("SELECT * FROM registered_users WHERE address = ?", (address,))
-			existing = cur.fetchone()
-			# Enforce moniker uniqueness among active (pending/registered) users
-			if self.moniker_in_use(moniker, ignore_address=address):
-				raise ValueError("moniker already in use")
-			if existing is None:
-				cur.execute(
-					"""
-					INSERT INTO registered_users (moniker, address, pubkey, pubkey_hash, rego_fee, rego_uuid, rego_transaction, status, last_update)
-					VALUES (?, ?, ?, ?, ?, ?, NULL, 'pending', ?)
-					""",
-					(moniker, address, pubkey, pubkey_hash, float(rego_fee), rego_uuid, now_ts),
-				)
-				cur.execute("SELECT * FROM registered_users WHERE address = ?", (address,))
+		with self._cursor() as cur:
+			# One write transaction: the moniker check and the upsert cannot interleave with
+			# another registration
+			cur.execute("BEGIN IMMEDIATE")
+			try:
+				# Enforce moniker uniqueness among active (pending/registered) users
+				cur.execute(SQL_MONIKER_IN_USE_IGNORE, (moniker, address))
+				if cur.fetchone() is not None:
+					raise ValueError("moniker already in use")
+				cur.execute(SQL_UPSERT_PENDING, (moniker, address, pubkey, pubkey_hash, float(rego_fee), rego_uuid, now_ts))
 				row = cur.fetchone()
-				assert row is not None
-				return self._row_to_model(row)
-			else:
-				if existing["status"] in ("pending", "registered"):
-					raise ValueError(f"address already {existing['status']}")
-				# expired -> refresh as new registration
-				cur.execute(
-					"""
-					UPDATE registered_users
-					SET moniker = ?, pubkey = ?, pubkey_hash = ?, rego_fee = ?, rego_uuid = ?, rego_transaction = NULL, status = 'pending', last_update = ?
-					WHERE address = ?
-					""",
-					(moniker, pubkey, pubkey_hash, float(rego_fee), rego_uuid, now_ts, address),
-				)
-				cur.execute("SELECT * FROM registered_users WHERE address = ?", (address,))
-				row2 = cur.fetchone()
-				assert row2 is not None
-				return self._row_to_model(row2)
+				if row is None:
+					cur.execute(SQL_STATUS_BY_ADDRESS, (address,))
+					raise ValueError(f"address already {cur.fetchone()['status']}")
+				cur.execute("COMMIT")
+			except BaseException:
+				cur.execute("ROLLBACK")
+				raise
+			return self._row_to_model(row)
 
 	def list_pending(self) -> List[RegisteredUser]:
-		with self._connect() as conn, closing(conn.cursor()) as cur:
-			cur.execute("SELECT * FROM registered_users WHERE status = 'pending' ORDER BY last_update ASC")
+		with self._cursor() as cur:
+			cur.execute(SQL_LIST_PENDING)
 			return [self._row_to_model(r) for r in cur.fetchall()]
 
 	def expire_old(self, older_than_seconds: int) -> int:
 		threshold = int(time.time()) - int(older_than_seconds)
-		with self._connect() as conn, closing(conn.cursor()) as cur:
+		with self._cursor() as cur:
 			cur.execute(
-				"UPDATE registered_users SET status = 'expired', last_update = ? WHERE status = 'pending' AND last_update < ?",
+				SQL_EXPIRE_OLD,
 				(int(time.time()), threshold),
 			)
 			return cur.rowcount or 0
 
 	def set_registered(self, *, address: str, txid: str) -> None:
-		with self._connect() as conn, closing(conn.cursor()) as cur:
+		with self._cursor() as cur:
 			cur.execute(
-				"UPDATE registered_users SET rego_transaction = ?, status = 'registered', last_update = ? WHERE address = ? AND status = 'pending'",
+				SQL_SET_REGISTERED,
 				(txid, int(time.time()), address),
 			)
 
 	def list_players(self) -> List[Dict[str, Any]]:
-		with self._connect() as conn, closing(conn.cursor()) as cur:
-			cur.execute("SELECT moniker, pubkey_hash FROM registered_users WHERE status = 'registered' ORDER BY moniker ASC")
+		with self._cursor() as cur:
+			cur.execute(SQL_LIST_PLAYERS)
 			rows = cur.fetchall()
 			return [{"moniker": str(r["moniker"]), "pubkey_hash": str(r["pubkey_hash"])} for r in rows]
 
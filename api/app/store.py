@@ -1,50 +1,292 @@
 from __future__ import annotations
 
 import bisect
+from array import array
+import heapq
+import math
+import operator
+import sys
 import threading
+import time
 from collections import defaultdict
 from dataclasses import dataclass
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 from .models import Swap
 from .events import Event
 from .prices import PriceCache
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+
+
+# Up to this many pubkey_search matches are ranked by counting the traders ahead of each one
+# (one C-level pass per match); more than that and one sort of all traders is cheaper
+_SEARCH_RANK_SCAN_LIMIT = 32
+
+# Range of the packed int64 time index entries
+_INT64_MIN = -(2 ** 63)
+_INT64_MAX = 2 ** 63 - 1
+
+_FINISHED_AT = operator.attrgetter("finished_at")
+_MAKER_AMOUNT = operator.attrgetter("maker_amount_float")
+_TAKER_AMOUNT = operator.attrgetter("taker_amount_float")
+
+
+def _wall_clock() -> int:
+	return int(time.time())
 
 
 def _pair_key(maker_coin: str, taker_coin: str) -> str:
 	return f"{maker_coin.upper()}|{taker_coin.upper()}"
 
 
-def _normalize_symbol(coin_symbol: Optional[str], coin_ticker: Optional[str]) -> str:
-	"""Prefer ticker if available; otherwise strip platform suffixes like -segwit from symbol.
+def _swap_pair_key(swap: Swap) -> str:
+	# Same key as _pair_key, from the swap's already normalized symbols
+	return f"{swap.maker_symbol}|{swap.taker_symbol}"
+
 
-	This ensures keys like KMD|DGB match even when DB symbol is DGB-segwit.
+def pubkey_search_filter(pubkey_search: str) -> Callable[[Swap], bool]:
+	"""Predicate: either pubkey of a swap contains pubkey_search (case-insensitive).
+
+	Each distinct pubkey is lower-cased and searched once per predicate, not once per swap.
 	"""
-	if coin_ticker and str(coin_ticker).strip():
-		return str(coin_ticker).upper()
-	# Fallback: remove suffix after '-' (e.g., DGB-segwit -> DGB)
-	base = (coin_symbol or "").split("-")[0]
-	return base.upper()
+	needle = pubkey_search.lower()
+	hits: Dict[str, bool] = {}
+
+	def _hit(pk: Optional[str]) -> bool:
+		if not pk:
+			return False
+		hit = hits.get(pk)
+		if hit is None:
+			hit = hits[pk] = needle in pk.lower()
+		return hit
+
+	def _matches(s: Swap) -> bool:
+		return _hit(s.maker_pubkey) or _hit(s.taker_pubkey)
 
+	return _matches
 
-@dataclass(order=True)
-class _TimedSwap:
-	finished_at: int
-	uuid: str
+
+class _TimeIndex:
+	"""Swaps ordered by (finished_at, uuid), kept as parallel times / uuids / swaps lists.
+
+	`times` is a packed int64 array (8 bytes per entry instead of a pointer plus an int object)
+	that range lookups bisect directly. `swaps` holds the Swap objects themselves, so
+	readers slice it directly instead of resolving each uuid through the store's dict.
+	"""
+
+	__slots__ = ("times", "uuids", "swaps")
+
+	def __init__(self, entries: Iterable[Tuple[int, str, Optional[Swap]]] = ()) -> None:
+		# entries must already be sorted
+		self.times = array("q")
+		self.uuids: List[str] = []
+		self.swaps: List[Optional[Swap]] = []
+		for ts, uuid, swap in entries:
+			self.times.append(ts)
+			self.uuids.append(uuid)
+			self.swaps.append(swap)
+
+	def __len__(self) -> int:
+		return len(self.times)
+
+	def insert(self, ts: int, uuid: str, swap: Optional[Swap] = None) -> None:
+		times = self.times
+		lo = bisect.bisect_left(times, ts)
+		hi = bisect.bisect_right(times, ts, lo)
+		# Equal timestamps stay ordered by uuid
+		i = bisect.bisect_right(self.uuids, uuid, lo, hi) if hi > lo else lo
+		times.insert(i, ts)
+		self.uuids.insert(i, uuid)
+		self.swaps.insert(i, swap)
+
+	def window(self, start_ts: int, end_ts: int) -> Tuple[int, int]:
+		"""Index range [left, right) of entries with start_ts <= finished_at <= end_ts."""
+		return bisect.bisect_left(self.times, start_ts), bisect.bisect_right(self.times, end_ts)
+
+	def pop_through(self, cutoff: int) -> List[str]:
+		"""Remove and return the uuids of every entry with finished_at <= cutoff."""
+		idx = bisect.bisect_right(self.times, cutoff)
+		expired = self.uuids[:idx]
+		del self.times[:idx]
+		del self.uuids[:idx]
+		del self.swaps[:idx]
+		return expired
+
+	def discard_through(self, cutoff: int, uuids: set) -> None:
+		"""Drop the given uuids, all of which finished at or before cutoff."""
+		right = bisect.bisect_right(self.times, cutoff)
+		if right == len(uuids):
+			# Nothing event-protected in the prefix: drop it wholesale
+			del self.times[:right]
+			del self.uuids[:right]
+			del self.swaps[:right]
+			return
+		keep = [i for i in range(right) if self.uuids[i] not in uuids]
+		self.times[:right] = array("q", [self.times[i] for i in keep])
+		self.uuids[:right] = [self.uuids[i] for i in keep]
+		self.swaps[:right] = [self.swaps[i] for i in keep]
+
+
+@dataclass(slots=True)
+class _TraderTotals:
+	"""Running per-trader sums for one event.
+
+	Volume traded without a recorded swap price is kept apart so it can be valued with the
+	cache price at read time, since cache prices move after the swap is stored.
+	"""
+	base_coin_volume: float = 0.0
+	rel_coin_volume: float = 0.0
+	usd_base_recorded: float = 0.0
+	usd_rel_recorded: float = 0.0
+	base_unpriced_volume: float = 0.0
+	rel_unpriced_volume: float = 0.0
+	trades_as_maker: int = 0
+	trades_as_taker: int = 0
+	trades_total: int = 0
+	last_finished_at: int = 0
+
+
+def _accumulate_trader_totals(totals: defaultdict[str, _TraderTotals], swap: Swap, base: str, rel: str) -> None:
+	"""Credit one swap's event-pair volumes to both participants (irrespective of role).
+
+	totals creates a trader's record on first access, so known traders cost one lookup.
+	"""
+	maker_pk = swap.maker_pubkey
+	taker_pk = swap.taker_pubkey
+	if taker_pk == maker_pk:
+		# A self-trade is one trade for that pubkey: credit it once, as maker
+		taker_pk = None
+	if not maker_pk and not taker_pk:
+		return
+	maker_sym = swap.maker_symbol
+	taker_sym = swap.taker_symbol
+	base_vol = rel_vol = 0.0
+	base_usd = rel_usd = 0.0
+	base_unpriced = rel_unpriced = 0.0
+	maker_amount = swap.maker_amount_float
+	taker_amount = swap.taker_amount_float
+	maker_price = swap.maker_usd_price_float
+	taker_price = swap.taker_usd_price_float
+	if maker_sym == base:
+		base_vol += maker_amount
+		if maker_price is not None:
+			base_usd += maker_amount * maker_price
+		else:
+			base_unpriced += maker_amount
+	elif maker_sym == rel:
+		rel_vol += maker_amount
+		if maker_price is not None:
+			rel_usd += maker_amount * maker_price
+		else:
+			rel_unpriced += maker_amount
+	if taker_sym == base:
+		base_vol += taker_amount
+		if taker_price is not None:
+			base_usd += taker_amount * taker_price
+		else:
+			base_unpriced += taker_amount
+	elif taker_sym == rel:
+		rel_vol += taker_amount
+		if taker_price is not None:
+			rel_usd += taker_amount * taker_price
+		else:
+			rel_unpriced += taker_amount
+	finished_at = swap.finished_at
+	for pk, as_maker in ((maker_pk, True), (taker_pk, False)):
+		if not pk:
+			continue
+		t = totals[pk]
+		t.base_coin_volume += base_vol
+		t.rel_coin_volume += rel_vol
+		t.usd_base_recorded += base_usd
+		t.usd_rel_recorded += rel_usd
+		t.base_unpriced_volume += base_unpriced
+		t.rel_unpriced_volume += rel_unpriced
+		t.trades_total += 1
+		if as_maker:
+			t.trades_as_maker += 1
+		else:
+			t.trades_as_taker += 1
+		if finished_at > t.last_finished_at:
+			t.last_finished_at = finished_at
+
+
+def _usd_values(t: _TraderTotals, base_price: Optional[float], rel_price: Optional[float]) -> Tuple[float, float]:
+	# Recorded swap valuations plus unpriced volume at the current cache price
+	return (
+		t.usd_base_recorded + t.base_unpriced_volume * (base_price or 0.0),
+		t.usd_rel_recorded + t.rel_unpriced_volume * (rel_price or 0.0),
+	)
+
+
+def _trader_rows(totals: Iterable[Tuple[str, _TraderTotals]], base_price: Optional[float], rel_price: Optional[float]) -> List[dict]:
+	rows: List[dict] = []
+	for pk, t in totals:
+		usd_base_value, usd_rel_value = _usd_values(t, base_price, rel_price)
+		# Effective average prices per trader, falling back to cache prices without volume
+		base_avg = (usd_base_value / t.base_coin_volume) if t.base_coin_volume else None
+		rel_avg = (usd_rel_value / t.rel_coin_volume) if t.rel_coin_volume else None
+		rows.append({
+			"pubkey": pk,
+			"base_coin_volume": t.base_coin_volume,
+			"rel_coin_volume": t.rel_coin_volume,
+			"trades_as_maker": t.trades_as_maker,
+			"trades_as_taker": t.trades_as_taker,
+			"trades_total": t.trades_total,
+			"last_finished_at": t.last_finished_at,
+			"usd_base_price": base_avg if base_avg is not None else base_price,
+			"usd_rel_price": rel_avg if rel_avg is not None else rel_price,
+			"usd_base_value": usd_base_value,
+			"usd_rel_value": usd_rel_value,
+			"usd_total_value": usd_base_value + usd_rel_value,
+		})
+	return rows
 
 
 class SwapStore:
-	"""Thread-safe in-memory store for swaps and derived stats."""
+	"""Thread-safe in-memory store for swaps and derived stats.
 
-	def __init__(self) -> None:
+	Writers hold the lock. set_events publishes fresh event containers by a single reference
+	assignment each, and lookups that read one reference (or do one dict get) run without it;
+	anything walking the time indexes, which are mutated in place, still takes the lock.
+	"""
+
+	def __init__(self, clock: Callable[[], int] = _wall_clock) -> None:
+		# Source of "now" (integer unix seconds) for prune() when no timestamp is passed
+		self._clock = clock
 		self._lock = threading.RLock()
 		self._uuid_to_swap: Dict[str, Swap] = {}
-		self._pair_to_uuids_by_time: Dict[str, List[_TimedSwap]] = defaultdict(list)
+		self._pair_to_uuids_by_time: Dict[str, _TimeIndex] = defaultdict(_TimeIndex)
 		self._events: List[Event] = []
+		self._event_groups: Dict[str, List[Event]] = {}
+		# group name -> (earliest start, latest stop) across the group's events
+		self._group_windows: Dict[str, Tuple[int, int]] = {}
+		# (group windows it was built from, valid_from, valid_until, status -> group names): the
+		# classification only changes when the clock crosses a window boundary or set_events swaps
+		# in new windows, so it is reused until then
+		self._group_status: Optional[Tuple[Dict[str, Tuple[int, int]], int, float, Dict[str, List[str]]]] = None
+		# event name -> pubkey -> swaps in the event window where the pubkey traded.
+		# Swaps inside event windows are never pruned, so this only changes on insert/set_events.
+		self._event_pubkey_index: Dict[str, defaultdict[str, List[Swap]]] = {}
+		# event name -> pubkey -> running totals over the event window, maintained the same way
+		self._event_trader_totals: Dict[str, defaultdict[str, _TraderTotals]] = {}
+		self._event_by_name: Dict[str, Event] = {}
+		# "MAKER|TAKER" symbol key (both orderings) -> events on that pair, in events order, so an
+		# insert is only checked against the windows of its own pair's events
+		self._events_by_pair: Dict[str, List[Event]] = {}
+		# event name -> stamp that changes whenever the event's indexed swaps change (new swap in
+		# the window or an events reload); stamps come from one store-wide increasing counter
+		self._event_versions: Dict[str, int] = {}
+		self._version_seq: int = 0
+		# event name -> (version, base volume, rel volume, user count, trade count) for event_overview;
+		# an entry is current while its version matches the event's stamp
+		self._overview_totals: Dict[str, Tuple[int, float, float, int, int]] = {}
+		# event name -> swaps in the event window matching its pair, sorted by finished_at
+		self._event_swaps: Dict[str, _TimeIndex] = {}
+		# Swaps outside every event window, sorted by finished_at: the only ones prune may evict
+		self._prunable = _TimeIndex()
 		self._retention_seconds: int = 1 * 3600
 		self._price_cache: Optional[PriceCache] = None
 
@@ -53,12 +295,84 @@ class SwapStore:
 			self._retention_seconds = max(0, hours) * 3600
 
 	def set_events(self, events: List[Event]) -> None:
+		groups: Dict[str, List[Event]] = {}
+		for ev in events:
+			# Interned: request-side lookups of the same names then hit on identity
+			groups.setdefault(sys.intern(str(ev.extra.get("group_name") or ev.name)), []).append(ev)
+		windows = {name: (min(int(e.start) for e in lst), max(int(e.stop) for e in lst)) for name, lst in groups.items()}
 		with self._lock:
 			self._events = events
+			self._event_groups = groups
+			self._group_windows = windows
+			self._group_status = None
+			self._event_by_name = {ev.name: ev for ev in events}
+			by_pair: Dict[str, List[Event]] = defaultdict(list)
+			for ev in events:
+				for key in set(ev.pair_keys):
+					by_pair[key].append(ev)
+			self._events_by_pair = dict(by_pair)
+			self._event_pubkey_index = {ev.name: defaultdict(list) for ev in events}
+			self._event_trader_totals = {ev.name: defaultdict(_TraderTotals) for ev in events}
+			self._event_swaps = {ev.name: _TimeIndex() for ev in events}
+			self._version_seq += 1
+			self._event_versions = {ev.name: self._version_seq for ev in events}
+			self._overview_totals = {}
+			prunable: List[Tuple[int, str, Swap]] = []
+			for swap in self._uuid_to_swap.values():
+				if not self._index_event_swap_locked(swap):
+					prunable.append((swap.finished_at, swap.uuid, swap))
+			# uuids are unique, so the sort never compares the swaps
+			prunable.sort()
+			self._prunable = _TimeIndex(prunable)
 
 	def get_events(self) -> List[Event]:
-		with self._lock:
-			return list(self._events)
+		return list(self._events)
+
+	def get_event_groups(self) -> Dict[str, List[Event]]:
+		"""Group name -> events, built once per set_events. Callers must treat it as read-only."""
+		return self._event_groups
+
+	def get_group_windows(self) -> Dict[str, Tuple[int, int]]:
+		"""Group name -> (start, stop) window, built once per set_events. Read-only for callers."""
+		return self._group_windows
+
+	def group_names_by_status(self, now_ts: int) -> Dict[str, List[str]]:
+		"""Group names split into "complete" / "active" / "upcoming" at now_ts (group index order).
+
+		Reclassified only when now_ts leaves the span the cached result is valid for. Runs without
+		the store lock (it may be called from the event loop): it classifies a snapshot of the
+		group windows, and a cached result only counts while that snapshot is still current.
+		Read-only for callers.
+		"""
+		windows = self._group_windows
+		cached = self._group_status
+		if cached is not None and cached[0] is windows and cached[1] <= now_ts < cached[2]:
+			return cached[3]
+		status: Dict[str, List[str]] = {"complete": [], "active": [], "upcoming": []}
+		# A group turns active at its start and complete at stop + 1
+		valid_until = None
+		for name, (start_ts, stop_ts) in windows.items():
+			if stop_ts < now_ts:
+				status["complete"].append(name)
+				continue
+			if start_ts <= now_ts:
+				status["active"].append(name)
+				change = stop_ts + 1
+			else:
+				status["upcoming"].append(name)
+				change = start_ts
+			if valid_until is None or change < valid_until:
+				valid_until = change
+		self._group_status = (windows, now_ts, valid_until if valid_until is not None else float("inf"), status)
+		return status
+
+	def event_version(self, name: str) -> Optional[int]:
+		"""Stamp for an event's indexed swaps: equal stamps mean its swaps and totals are unchanged."""
+		return self._event_versions.get(name)
+
+	def get_event_by_name(self, name: str) -> Optional[Event]:
+		"""Constant-time lookup of a single (per-pair) event by name."""
+		return self._event_by_name.get(name)
 
 	def set_price_cache(self, cache: PriceCache) -> None:
 		with self._lock:
@@ -69,70 +383,114 @@ class SwapStore:
 		if swap.finished_at is None:
 			return False
 		with self._lock:
-			if swap.uuid in self._uuid_to_swap:
-				return False
-			self._uuid_to_swap[swap.uuid] = swap
-			maker_sym = _normalize_symbol(swap.maker_coin, swap.maker_coin_ticker)
-			taker_sym = _normalize_symbol(swap.taker_coin, swap.taker_coin_ticker)
-			key = _pair_key(maker_sym, taker_sym)
-			bucket = self._pair_to_uuids_by_time[key]
-			bisect.insort(bucket, _TimedSwap(finished_at=int(swap.finished_at), uuid=swap.uuid))
-			# logger.info(f"Indexed swap {swap.uuid} under key {key} at ts={swap.finished_at}; bucket_size={len(bucket)}")
-			return True
+			return self._insert_locked(swap)
 
-	def get_swap(self, uuid: str) -> Optional[Swap]:
+	def upsert_swaps(self, swaps: Iterable[Swap]) -> int:
+		"""Insert a batch of swaps under a single lock acquisition. Returns number newly added."""
+		added = 0
 		with self._lock:
-			return self._uuid_to_swap.get(uuid)
+			for swap in swaps:
+				if swap.finished_at is None:
+					continue
+				if self._insert_locked(swap):
+					added += 1
+		return added
+
+	def _insert_locked(self, swap: Swap) -> bool:
+		# Callers only pass finished swaps. finished_at must already be an int (Swap validates it;
+		# the monitor's model_construct path coerces it in _row_to_swap). A value the packed time
+		# indexes cannot hold is rejected here, before anything is indexed, so an insert is all or
+		# nothing and a retried batch never skips a half-indexed swap as a duplicate.
+		if swap.uuid in self._uuid_to_swap:
+			return False
+		ts = swap.finished_at
+		if not isinstance(ts, int) or not _INT64_MIN <= ts <= _INT64_MAX:
+			logger.warning(f"Skipping swap {swap.uuid}: finished_at {ts!r} is not an int64 timestamp")
+			return False
+		self._pair_to_uuids_by_time[_swap_pair_key(swap)].insert(ts, swap.uuid, swap)
+		if not self._index_event_swap_locked(swap):
+			self._prunable.insert(ts, swap.uuid, swap)
+		# Registered last: the uuid map is what marks a swap as stored
+		self._uuid_to_swap[swap.uuid] = swap
+		return True
+
+	def _index_event_swap_locked(self, swap: Swap) -> bool:
+		"""Add a stored (finished) swap to the per-event indexes. Returns True if it falls in any event window."""
+		if not self._events:
+			return False
+		in_event = False
+		ts = swap.finished_at
+		pubkeys = {pk for pk in (swap.maker_pubkey, swap.taker_pubkey) if pk}
+		for ev in self._events_by_pair.get(_swap_pair_key(swap), ()):
+			if ev.start <= ts <= ev.stop:
+				by_pubkey = self._event_pubkey_index[ev.name]
+				for pk in pubkeys:
+					by_pubkey[pk].append(swap)
+				_accumulate_trader_totals(self._event_trader_totals[ev.name], swap, ev.base_symbol, ev.rel_symbol)
+				self._event_swaps[ev.name].insert(ts, swap.uuid, swap)
+				self._version_seq += 1
+				self._event_versions[ev.name] = self._version_seq
+				in_event = True
+		return in_event
+
+	def event_pubkeys(self, event: Event) -> List[str]:
+		"""Distinct pubkeys that traded the event pair within the event window."""
+		with self._lock:
+			return list(self._event_pubkey_index.get(event.name, {}))
 
-	def total_count(self) -> int:
+	def swaps_for_event_pubkeys(self, event: Event, pubkeys: Iterable[str]) -> List[Swap]:
+		"""Swaps within the event window where any of pubkeys was maker or taker, newest first."""
 		with self._lock:
-			return len(self._uuid_to_swap)
+			by_pubkey = self._event_pubkey_index.get(event.name, {})
+			result: Dict[str, Swap] = {}
+			for pk in pubkeys:
+				for s in by_pubkey.get(pk, ()):
+					result[s.uuid] = s
+		return sorted(result.values(), key=_FINISHED_AT, reverse=True)
 
-	def _is_within_any_event(self, swap: Swap) -> bool:
-		if not self._events:
-			return False
-		maker_sym = _normalize_symbol(swap.maker_coin, swap.maker_coin_ticker)
-		taker_sym = _normalize_symbol(swap.taker_coin, swap.taker_coin_ticker)
-		for ev in self._events:
-			if swap.finished_at is None:
-				continue
-			if ev.matches_pair(maker_sym, taker_sym) and ev.start <= int(swap.finished_at) <= ev.stop:
-				return True
-		return False
+	def get_swap(self, uuid: str) -> Optional[Swap]:
+		return self._uuid_to_swap.get(uuid)
+
+	def total_count(self) -> int:
+		return len(self._uuid_to_swap)
 
-	def prune(self, now_ts: int) -> int:
+	def prune(self, now_ts: Optional[int] = None) -> int:
 		"""Prune swaps older than retention window unless protected by event windows.
 
-		Returns number of removed swaps.
+		now_ts defaults to the store's clock. Only the expired prefix of the prunable list is
+		visited, so the cost scales with the number of evicted swaps rather than the number
+		stored. Returns number of removed swaps.
 		"""
+		if now_ts is None:
+			now_ts = self._clock()
 		cutoff = now_ts - self._retention_seconds
-		removed = 0
 		with self._lock:
-			# Collect UUIDs to delete
-			to_delete: List[str] = []
-			for uuid, swap in list(self._uuid_to_swap.items()):
-				if swap.finished_at is None:
+			expired = self._prunable.pop_through(int(cutoff))
+			if not expired:
+				return 0
+			removed_by_key: Dict[str, set] = defaultdict(set)
+			for uuid in expired:
+				swap = self._uuid_to_swap.pop(uuid, None)
+				if swap is None:
 					continue
-				if int(swap.finished_at) <= cutoff and not self._is_within_any_event(swap):
-					# logger.info(f"Pruning swap {uuid} because it is older than {cutoff}")
-					to_delete.append(uuid)
-
-			# Remove from primary map
-			for uuid in to_delete:
-				removed += 1
-				del self._uuid_to_swap[uuid]
-
-			# Rebuild pair buckets for removed uuids
-			if to_delete:
-				for key, bucket in list(self._pair_to_uuids_by_time.items()):
-					self._pair_to_uuids_by_time[key] = [entry for entry in bucket if entry.uuid not in to_delete]
-		return removed
+				removed_by_key[_swap_pair_key(swap)].add(uuid)
+			# Evicted entries sit in each bucket's prefix up to the cutoff
+			for key, uuids in removed_by_key.items():
+				self._pair_to_uuids_by_time[key].discard_through(int(cutoff), uuids)
+			return sum(len(uuids) for uuids in removed_by_key.values())
+
+	def next_expiry(self) -> Optional[int]:
+		"""Timestamp at which the oldest prunable swap leaves the retention window, or None."""
+		with self._lock:
+			if not self._prunable:
+				return None
+			return self._prunable.times[0] + self._retention_seconds
 
 	def stats_for_pair(self, maker_coin: str, taker_coin: str, start_ts: int, end_ts: int) -> dict:
 		"""Compute aggregate stats for a pair within [start_ts, end_ts]."""
 		key = _pair_key(maker_coin, taker_coin)
 		with self._lock:
-			bucket = self._pair_to_uuids_by_time.get(key, [])
+			bucket = self._pair_to_uuids_by_time.get(key)
 			if not bucket:
 				return {
 					"maker_coin": maker_coin.upper(),
@@ -143,49 +501,63 @@ class SwapStore:
 					"maker_amount_sum": "0",
 					"taker_amount_sum": "0",
 				}
-			left = bisect.bisect_left(bucket, _TimedSwap(finished_at=int(start_ts), uuid=""))
-			right = bisect.bisect_right(bucket, _TimedSwap(finished_at=int(end_ts), uuid="\uffff"))
-			subset = bucket[left:right]
-			maker_sum = 0
-			taker_sum = 0
-			for entry in subset:
-				s = self._uuid_to_swap.get(entry.uuid)
-				if not s:
-					continue
-				# Convert Decimal to numeric via str to avoid float rounding issues
-				maker_sum += float(str(s.maker_amount))
-				taker_sum += float(str(s.taker_amount))
+			left, right = bucket.window(int(start_ts), int(end_ts))
+			# Buckets hold the swaps themselves (prune drops them with the uuid map entry); the
+			# float amounts are cached per swap, so both sums are C-level reductions; fsum keeps them
+			# exactly rounded however widely the amounts' magnitudes differ
+			swaps = bucket.swaps[left:right]
+			maker_sum = math.fsum(map(_MAKER_AMOUNT, swaps))
+			taker_sum = math.fsum(map(_TAKER_AMOUNT, swaps))
 			return {
 				"maker_coin": maker_coin.upper(),
 				"taker_coin": taker_coin.upper(),
 				"start": start_ts,
 				"end": end_ts,
-				"total_swaps": len(subset),
+				"total_swaps": len(swaps),
 				"maker_amount_sum": f"{maker_sum}",
 				"taker_amount_sum": f"{taker_sum}",
 			}
 
 	def event_overview(self, event: Event) -> dict:
-		"""Overview for an event window and its coin pair (role-agnostic volumes)."""
-		swaps = self.swaps_for_event_pair(event, event.start, event.stop)
-		base_sum = 0.0
-		rel_sum = 0.0
-		users = set()
-		for s in swaps:
-			maker_sym = _normalize_symbol(s.maker_coin, s.maker_coin_ticker)
-			taker_sym = _normalize_symbol(s.taker_coin, s.taker_coin_ticker)
-			if maker_sym.upper() == event.base_coin.upper():
-				base_sum += float(str(s.maker_amount))
-			elif maker_sym.upper() == event.rel_coin.upper():
-				rel_sum += float(str(s.maker_amount))
-			if taker_sym.upper() == event.base_coin.upper():
-				base_sum += float(str(s.taker_amount))
-			elif taker_sym.upper() == event.rel_coin.upper():
-				rel_sum += float(str(s.taker_amount))
-			if s.maker_pubkey:
-				users.add(s.maker_pubkey)
-			if s.taker_pubkey:
-				users.add(s.taker_pubkey)
+		"""Overview for an event window and its coin pair (role-agnostic volumes).
+
+		Volumes and counts of a registered event are reused until its version stamp changes;
+		USD values always use the current cache prices.
+		"""
+		with self._lock:
+			version = self._event_versions.get(event.name) if self._event_by_name.get(event.name) == event else None
+			cached = self._overview_totals.get(event.name) if version is not None else None
+			if cached is not None and cached[0] == version:
+				_, base_sum, rel_sum, user_count, total_trades = cached
+			else:
+				swaps = self.swaps_for_event_pair(event, event.start, event.stop)
+				# Volumes are collected and fsum'd once: exactly rounded, unlike a running float sum
+				base_amounts: List[float] = []
+				rel_amounts: List[float] = []
+				users = set()
+				base = event.base_symbol
+				rel = event.rel_symbol
+				for s in swaps:
+					maker_sym = s.maker_symbol
+					taker_sym = s.taker_symbol
+					if maker_sym == base:
+						base_amounts.append(s.maker_amount_float)
+					elif maker_sym == rel:
+						rel_amounts.append(s.maker_amount_float)
+					if taker_sym == base:
+						base_amounts.append(s.taker_amount_float)
+					elif taker_sym == rel:
+						rel_amounts.append(s.taker_amount_float)
+					if s.maker_pubkey:
+						users.add(s.maker_pubkey)
+					if s.taker_pubkey:
+						users.add(s.taker_pubkey)
+				base_sum = math.fsum(base_amounts)
+				rel_sum = math.fsum(rel_amounts)
+				user_count = len(users)
+				total_trades = len(swaps)
+				if version is not None:
+					self._overview_totals[event.name] = (version, base_sum, rel_sum, user_count, total_trades)
 		b_price = self._price_cache.get_price_usd(event.base_coin) if self._price_cache else None
 		r_price = self._price_cache.get_price_usd(event.rel_coin) if self._price_cache else None
 		usd_base_value = base_sum * (b_price or 0.0)
@@ -196,8 +568,8 @@ class SwapStore:
 			"stop": event.stop,
 			"event_base_coin": event.base_coin,
 			"event_rel_coin": event.rel_coin,
-			"user_count": len(users),
-			"total_trades": len(swaps),
+			"user_count": user_count,
+			"total_trades": total_trades,
 			"total_base_coin_volume": f"{base_sum}",
 			"total_rel_coin_volume": f"{rel_sum}",
 			"usd_base_price": b_price,
@@ -207,132 +579,106 @@ class SwapStore:
 			"usd_total_value": usd_base_value + usd_rel_value,
 		}
 
-	def swaps_for_event_pair(self, event: Event, start_ts: int, end_ts: int) -> List[Swap]:
-		"""Return swaps for the event pair within the time window, regardless of maker/taker role."""
-		logger.info(f"Swaps for event pair {event.name} {event.base_coin} {event.rel_coin} {start_ts} {end_ts}")
+	def _is_indexed_window_locked(self, event: Event, start_ts: int, end_ts: int) -> bool:
+		# Per-event indexes only cover registered events over their own window
+		return self._event_by_name.get(event.name) == event and (int(start_ts), int(end_ts)) == (event.start, event.stop)
+
+	def swaps_for_event_pair(self, event: Event, start_ts: int, end_ts: int, pubkey_search: Optional[str] = None) -> List[Swap]:
+		"""Return swaps for the event pair within the time window, regardless of maker/taker role, newest first.
+
+		With pubkey_search, only swaps where either pubkey contains it (case-insensitive) are
+		returned; registered events match it against their distinct traders, not every swap.
+		"""
+		logger.debug("Swaps for event pair %s %s %s %s %s", event.name, event.base_coin, event.rel_coin, start_ts, end_ts)
+		if pubkey_search:
+			needle = pubkey_search.lower()
+			with self._lock:
+				if self._is_indexed_window_locked(event, start_ts, end_ts):
+					return self.swaps_for_event_pubkeys(event, [pk for pk in self._event_pubkey_index[event.name] if needle in pk.lower()])
+			return list(filter(pubkey_search_filter(needle), self.swaps_for_event_pair(event, start_ts, end_ts)))
 		with self._lock:
-			left_key = _pair_key(event.base_coin, event.rel_coin)
-			right_key = _pair_key(event.rel_coin, event.base_coin)
-			result: List[Swap] = []
-			for key in (left_key, right_key):
-				# logger.info(f"Key: {key}")
-				bucket = self._pair_to_uuids_by_time.get(key, [])
+			if self._is_indexed_window_locked(event, start_ts, end_ts):
+				# Already ordered at insert time: no bucket scan or sort per request
+				return self._event_swaps[event.name].swaps[::-1]
+			# Both direction buckets are already time-ordered: merge their windows newest first
+			# on (time, uuid) instead of sorting the concatenation; uuids are unique, so the
+			# merge never compares the swaps themselves
+			streams = []
+			for key in event.pair_keys:
+				bucket = self._pair_to_uuids_by_time.get(key)
 				if not bucket:
 					continue
-				# logger.info(f"Bucket: {bucket}")
-				left = bisect.bisect_left(bucket, _TimedSwap(finished_at=int(start_ts), uuid=""))
-				# logger.info(f"Left: {left}")
-				right = bisect.bisect_right(bucket, _TimedSwap(finished_at=int(end_ts), uuid="\uffff"))
-				# logger.info(f"Right: {right}")
-				for entry in bucket[left:right]:
-					s = self._uuid_to_swap.get(entry.uuid)
-					if s:
-						# logger.info(f"Swap: {s}")
-						result.append(s)
-			return sorted(result, key=lambda s: int(s.finished_at or 0), reverse=True)
-
-	def aggregate_trader_metrics(self, event: Event, start_ts: int, end_ts: int, price_cache: Optional[PriceCache], pubkey_search: Optional[str] = None) -> List[dict]:
+				left, right = bucket.window(int(start_ts), int(end_ts))
+				if left < right:
+					streams.append(zip(reversed(bucket.times[left:right]), reversed(bucket.uuids[left:right]), reversed(bucket.swaps[left:right])))
+			return [swap for _, _, swap in heapq.merge(*streams, reverse=True)]
+
+	def _pair_window_swaps_locked(self, event: Event, start_ts: int, end_ts: int) -> List[Swap]:
+		# Event pair swaps in the window, in bucket order (unsorted across the two directions)
+		result: List[Swap] = []
+		for key in event.pair_keys:
+			bucket = self._pair_to_uuids_by_time.get(key)
+			if not bucket:
+				continue
+			left, right = bucket.window(int(start_ts), int(end_ts))
+			result.extend(bucket.swaps[left:right])
+		return result
+
+	def aggregate_trader_metrics(self, event: Event, start_ts: int, end_ts: int, price_cache: Optional[PriceCache], pubkey_search: Optional[str] = None, top_k: Optional[int] = None) -> List[dict]:
 		"""Aggregate per-trader metrics within event window, summing volumes per coin irrespective of maker/taker.
 
-		Sort by newest activity (finished_at desc) then by USD total value desc.
+		Registered events over their own window are served from totals maintained on insert;
+		any other window is aggregated by scanning the pair buckets. Rows are ranked by USD
+		total value desc (ties: newest activity first). With top_k (and no pubkey_search),
+		only the top_k highest ranked rows are selected and built.
 		"""
-		swaps = self.swaps_for_event_pair(event, start_ts, end_ts)
-
-		# Ensure prices are tracked and fetch cache values (may be None)
-		symbols = {event.base_coin.upper(), event.rel_coin.upper()}
 		base_cache_price: Optional[float] = None
 		rel_cache_price: Optional[float] = None
-		if price_cache:
-			price_cache.register_symbols(symbols)
-			base_cache_price = price_cache.get_price_usd(event.base_coin)
-			rel_cache_price = price_cache.get_price_usd(event.rel_coin)
-
-		per_trader: Dict[str, dict] = {}
-		for s in swaps:
-			maker_sym = _normalize_symbol(s.maker_coin, s.maker_coin_ticker)
-			taker_sym = _normalize_symbol(s.taker_coin, s.taker_coin_ticker)
-			pubkeys = list(filter(None, [s.maker_pubkey, s.taker_pubkey]))
-			for key in pubkeys:
-				rec = per_trader.setdefault(key, {
-					"pubkey": key,
-					"base_coin_volume": 0.0,
-					"rel_coin_volume": 0.0,
-					"trades_as_maker": 0,
-					"trades_as_taker": 0,
-					"trades_total": 0,
-					"last_finished_at": 0,
-					"usd_base_price": None,
-					"usd_rel_price": None,
-					"usd_base_value": 0.0,
-					"usd_rel_value": 0.0,
-					"usd_total_value": 0.0,
-				})
-			# Volumes irrespective of role (credited once per swap to both parties)
-			if maker_sym.upper() == event.base_coin.upper():
-				for key in pubkeys:
-					per_trader[key]["base_coin_volume"] += float(str(s.maker_amount))
-			elif maker_sym.upper() == event.rel_coin.upper():
-				for key in pubkeys:
-					per_trader[key]["rel_coin_volume"] += float(str(s.maker_amount))
-			if taker_sym.upper() == event.base_coin.upper():
-				for key in pubkeys:
-					per_trader[key]["base_coin_volume"] += float(str(s.taker_amount))
-			elif taker_sym.upper() == event.rel_coin.upper():
-				for key in pubkeys:
-					per_trader[key]["rel_coin_volume"] += float(str(s.taker_amount))
-
-			# USD value contributions with fallback to recorded per-swap prices when cache is missing
-			base_usd_add = 0.0
-			rel_usd_add = 0.0
-			if maker_sym.upper() == event.base_coin.upper():
-				maker_price = float(s.maker_coin_usd_price) if s.maker_coin_usd_price is not None else (base_cache_price or 0.0)
-				base_usd_add += float(str(s.maker_amount)) * maker_price
-			elif maker_sym.upper() == event.rel_coin.upper():
-				maker_price = float(s.maker_coin_usd_price) if s.maker_coin_usd_price is not None else (rel_cache_price or 0.0)
-				rel_usd_add += float(str(s.maker_amount)) * maker_price
-			if taker_sym.upper() == event.base_coin.upper():
-				taker_price = float(s.taker_coin_usd_price) if s.taker_coin_usd_price is not None else (base_cache_price or 0.0)
-				base_usd_add += float(str(s.taker_amount)) * taker_price
-			elif taker_sym.upper() == event.rel_coin.upper():
-				taker_price = float(s.taker_coin_usd_price) if s.taker_coin_usd_price is not None else (rel_cache_price or 0.0)
-				rel_usd_add += float(str(s.taker_amount)) * taker_price
-			for key in pubkeys:
-				per_trader[key]["usd_base_value"] += base_usd_add
-				per_trader[key]["usd_rel_value"] += rel_usd_add
-			# Role counts and totals per participant
-			for key in pubkeys:
-				per_trader[key]["trades_total"] += 1
-				if key == s.maker_pubkey:
-					per_trader[key]["trades_as_maker"] += 1
-				else:
-					per_trader[key]["trades_as_taker"] += 1
-				per_trader[key]["last_finished_at"] = max(per_trader[key]["last_finished_at"], int(s.finished_at or 0))
-
-		# Finalize prices and totals; compute effective average prices per trader
-		for rec in per_trader.values():
-			base_vol = rec["base_coin_volume"] or 0.0
-			rel_vol = rec["rel_coin_volume"] or 0.0
-			base_val = rec["usd_base_value"] or 0.0
-			rel_val = rec["usd_rel_value"] or 0.0
-			base_avg = (base_val / base_vol) if base_vol else None
-			rel_avg = (rel_val / rel_vol) if rel_vol else None
-			rec["usd_base_price"] = base_avg if base_avg is not None else base_cache_price
-			rec["usd_rel_price"] = rel_avg if rel_avg is not None else rel_cache_price
-			rec["usd_total_value"] = base_val + rel_val
-
-		rows = list(per_trader.values())
-		# Compute ranks by total USD value across the full set (1 = highest)
-		sorted_for_rank = sorted(rows, key=lambda r: r["usd_total_value"], reverse=True)
-		pubkey_to_rank = {r["pubkey"]: idx + 1 for idx, r in enumerate(sorted_for_rank)}
-		for r in rows:
-			r["rank"] = pubkey_to_rank.get(r["pubkey"])  # type: ignore[assignment]
-
-		# Apply optional pubkey search at the end so rank remains global
-		if pubkey_search:
-			needle = pubkey_search.lower()
-			rows = [r for r in rows if r.get("pubkey") and needle in str(r.get("pubkey")).lower()]
-
-		rows.sort(key=lambda r: r["rank"])  # primary sort by rank ascending
-		return rows
 
+		def _rank_key(item: Tuple[str, _TraderTotals]) -> Tuple[float, int]:
+			base_value, rel_value = _usd_values(item[1], base_cache_price, rel_cache_price)
+			return (-(base_value + rel_value), -item[1].last_finished_at)
 
+		with self._lock:
+			if self._is_indexed_window_locked(event, start_ts, end_ts):
+				totals = self._event_trader_totals[event.name]
+			else:
+				# Ad-hoc window: one unsorted pass over the pair buckets, no per-swap sort
+				totals = defaultdict(_TraderTotals)
+				base = event.base_symbol
+				rel = event.rel_symbol
+				for s in self._pair_window_swaps_locked(event, start_ts, end_ts):
+					_accumulate_trader_totals(totals, s, base, rel)
+			if not totals:
+				return []
+			# Ensure prices are tracked and fetch cache values (may be None)
+			if price_cache:
+				price_cache.register_symbols({event.base_symbol, event.rel_symbol})
+				base_cache_price = price_cache.get_price_usd(event.base_coin)
+				rel_cache_price = price_cache.get_price_usd(event.rel_coin)
+			if pubkey_search:
+				# Ranks stay global, but only matching traders get rows. (rank key, position) orders
+				# exactly like the stable sort below, so a trader's rank is 1 + the number of entries
+				# ordering before it: a narrow search counts instead of sorting every trader.
+				needle = pubkey_search.lower()
+				items = list(totals.items())
+				decorated = [(_rank_key(item), i) for i, item in enumerate(items)]
+				matched = sorted(d for d in decorated if needle in items[d[1]][0].lower())
+				if len(matched) <= _SEARCH_RANK_SCAN_LIMIT:
+					ranks = [1 + sum(map(d.__gt__, decorated)) for d in matched]
+				else:
+					order = sorted(decorated)
+					ranks = [bisect.bisect_left(order, d) + 1 for d in matched]
+				rows = _trader_rows([items[i] for _, i in matched], base_cache_price, rel_cache_price)
+				for r, rank in zip(rows, ranks):
+					r["rank"] = rank
+				return rows
+			# Compute ranks by total USD value across the full set (1 = highest)
+			if top_k is not None:
+				ranked = heapq.nsmallest(top_k, totals.items(), key=_rank_key)
+			else:
+				ranked = sorted(totals.items(), key=_rank_key)
+			rows = _trader_rows(ranked, base_cache_price, rel_cache_price)
+		for idx, r in enumerate(rows):
+			r["rank"] = idx + 1
+		return rows
@@ -55,6 +55,22 @@ def test_identify_returns_hash_for_matching_ticker(monkeypatch):
 
 
 
+def test_identify_matches_lowercase_ticker_and_keeps_it_as_recorded(monkeypatch):
+	monkeypatch.setenv("PUBKEY_HASH_KEY", "komodian")
+	monkeypatch.setenv("COIN_CONFIG_URL", "http://127.0.0.1:9/")
+	monkeypatch.setenv("RETENTION_HOURS", "999999")
+	app = create_app()
+	store = app.state.swap_state.store  # type: ignore[attr-defined]
+	s = _mk_swap("u-lower", "kmd", "arrr", maker_pub="makerPK", taker_pub="takerPK")
+	assert store.upsert_swap(s) is True
+	assert (s.maker_coin_ticker, s.taker_ticker_upper) == ("kmd", "ARRR")
+	with TestClient(app) as client:
+		r = client.get("/identify", params={"uuid": "u-lower", "ticker": "Arrr"})
+		assert r.status_code == 200
+		assert r.json() == {"pubkey_hash": _expect_hash("takerPK")}
+
+
+
 def test_identify_404_when_swap_not_found(monkeypatch):
 	monkeypatch.setenv("PUBKEY_HASH_KEY", "komodian")
 	monkeypatch.setenv("COIN_CONFIG_URL", "http://127.0.0.1:9/")
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.events import Event
+from app.main import create_app
+from app.models import Swap
+
+
+def _hash(value: str) -> str:
+	return hmac.new(b"komodian", value.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def _swap(uuid: str, finished_at: int, maker: str, taker: str, maker_pub: str, taker_pub: str, maker_amount: str, taker_amount: str, maker_usd: str | None = None, taker_usd: str | None = None) -> Swap:
+	return Swap(
+		id=finished_at,
+		uuid=uuid,
+		maker_coin=maker,
+		taker_coin=taker,
+		maker_coin_ticker=maker,
+		taker_coin_ticker=taker,
+		started_at=finished_at - 10,
+		finished_at=finished_at,
+		maker_amount=Decimal(maker_amount),
+		taker_amount=Decimal(taker_amount),
+		maker_coin_usd_price=Decimal(maker_usd) if maker_usd else None,
+		taker_coin_usd_price=Decimal(taker_usd) if taker_usd else None,
+		is_success=True,
+		maker_pubkey=maker_pub,
+		taker_pubkey=taker_pub,
+	)
+
+
+@pytest.fixture()
+def client(monkeypatch):
+	monkeypatch.setenv("PUBKEY_HASH_KEY", "komodian")
+	monkeypatch.setenv("COIN_CONFIG_URL", "http://127.0.0.1:9/")
+	monkeypatch.setenv("RETENTION_HOURS", "999999")
+	app = create_app()
+	store = app.state.swap_state.store  # type: ignore[attr-defined]
+	extra = {"group_name": "FEST", "rel_coins": ["DGB", "LTC"]}
+	store.set_events([
+		Event(name="FEST_DGB", start=100, stop=1000, base_coin="KMD", rel_coin="DGB", extra=dict(extra)),
+		Event(name="FEST_LTC", start=100, stop=1000, base_coin="KMD", rel_coin="LTC", extra=dict(extra)),
+	])
+	store.upsert_swaps([
+		_swap("s1", 200, "KMD", "DGB", "pkAlice", "pkBob", "10", "100", maker_usd="2", taker_usd="0.5"),
+		_swap("s2", 300, "DGB", "KMD", "pkBob", "pkCarol", "50", "5", maker_usd="0.5", taker_usd="2"),
+		_swap("s3", 400, "KMD", "LTC", "pkAlice", "pkCarol", "1", "1", maker_usd="2", taker_usd="100"),
+		# Outside the event window
+		_swap("s4", 5000, "KMD", "DGB", "pkAlice", "pkBob", "1", "1"),
+	])
+	with TestClient(app) as c:
+		yield c
+
+
+def test_trader_swaps_single_event_filters(client):
+	r = client.get("/trader_swaps", params={"event_name": "FEST"})
+	assert [row["uuid"] for row in r.json()] == ["s3", "s2", "s1"]
+	# Raw pubkey and hashed pubkey select the same swaps
+	raw = client.get("/trader_swaps", params={"event_name": "FEST", "pubkey": "pkAlice"}).json()
+	hashed = client.get("/trader_swaps", params={"event_name": "FEST", "pubkey": _hash("pkAlice")}).json()
+	assert [row["uuid"] for row in raw] == ["s3", "s1"]
+	assert [row["uuid"] for row in hashed] == ["s3", "s1"]
+	# Substring search is case-insensitive and matches either side
+	found = client.get("/trader_swaps", params={"event_name": "FEST", "search": "CAROL"}).json()
+	assert [row["uuid"] for row in found] == ["s3", "s2"]
+	both = client.get("/trader_swaps", params={"event_name": "FEST", "search": "bob", "pubkey": "pkCarol"}).json()
+	assert [row["uuid"] for row in both] == ["s2"]
+
+
+def test_trader_swaps_row_payload(client):
+	rows = client.get("/trader_swaps", params={"event_name": "FEST", "pubkey": "pkBob"}).json()
+	row = next(r for r in rows if r["uuid"] == "s1")
+	assert "maker_pubkey" not in row and "taker_pubkey" not in row
+	assert row["maker_pubkey_hash"] == _hash("pkAlice")
+	assert row["taker_pubkey_hash"] == _hash("pkBob")
+	assert row["usd_base_value"] == 20.0
+	assert row["usd_rel_value"] == 50.0
+	assert row["usd_total_value"] == 70.0
+	assert row["pair"] == "KMD/DGB"
+	assert row["event_name"] == "FEST_DGB"
+
+
+def test_trader_swaps_unknown_event(client):
+	r = client.get("/trader_swaps", params={"event_name": "NOPE"})
+	assert r.json() == {"error": "event `NOPE` not found"}
+
+
+def test_traders_ranks_and_pagination(client):
+	rows = client.get("/traders", params={"event_name": "FEST"}).json()
+	by_hash = {r["pubkey_hash"]: r for r in rows}
+	assert set(by_hash) == {_hash("pkAlice"), _hash("pkBob"), _hash("pkCarol")}
+	assert [r["rank"] for r in rows] == [1, 2, 3]
+	alice = by_hash[_hash("pkAlice")]
+	assert alice["trades_total"] == 2
+	assert alice["trades_as_maker"] == 2
+	# s1: 20 + 50, s3: 2 + 100
+	assert alice["usd_total_value"] == 172.0
+	assert set(alice["pairs"]) == {"KMD/DGB", "KMD/LTC"}
+	assert alice["pairs"]["KMD/LTC"]["usd_rel_value"] == 100.0
+	carol = by_hash[_hash("pkCarol")]
+	assert carol["usd_total_value"] == 137.0
+	page = client.get("/traders", params={"event_name": "FEST", "limit": 1, "offset": 1}).json()
+	assert [r["rank"] for r in page] == [2]
+	terse = client.get("/traders", params={"event_name": "FEST", "verbose": False}).json()
+	assert sorted(terse[0]["pairs"]) == ["KMD/DGB", "KMD/LTC"]
+
+
+def test_traders_ranking_refreshes_on_new_event_swap(client):
+	first = client.get("/traders", params={"event_name": "FEST"}).json()
+	assert first[0]["pubkey_hash"] == _hash("pkAlice")
+	store = client.app.state.swap_state.store
+	# Outside every event window: the cached ranking still applies
+	store.upsert_swap(_swap("late", 6000, "KMD", "DGB", "pkDave", "pkBob", "1000", "1", maker_usd="2"))
+	assert client.get("/traders", params={"event_name": "FEST"}).json() == first
+	store.upsert_swap(_swap("s5", 500, "KMD", "DGB", "pkDave", "pkBob", "1000", "1", maker_usd="2"))
+	rows = client.get("/traders", params={"event_name": "FEST"}).json()
+	# Both sides are credited the swap, so Bob (already ranked) stays ahead of Dave
+	assert [r["pubkey_hash"] for r in rows[:2]] == [_hash("pkBob"), _hash("pkDave")]
+	assert len(rows) == 4
+
+
+def test_events_and_event_details(client):
+	assert client.get("/events").json() == ["FEST"]
+	details = client.get("/event_details", params={"event_name": "FEST"}).json()
+	assert details == {"FEST": {"start": 100, "stop": 1000, "base_coin": "KMD", "rel_coins": ["DGB", "LTC"]}}
+	assert client.get("/events", params={"filter": "complete"}).json() == ["FEST"]
+	assert client.get("/events", params={"filter": "bogus"}).status_code == 400
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from bitcoin.core import Hash160
+
+from app.based58 import b58encode, calc_addr_from_pubkey, hash160
+
+
+# secp256k1 generator point, compressed
+_PUBKEY = "0279be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798"
+
+
+def test_calc_addr_from_pubkey_known_vectors():
+	assert calc_addr_from_pubkey("BTC", _PUBKEY) == "1BgGZ9tcN4rm9KBzDn7KprQz87SZ26SAMH"
+	assert calc_addr_from_pubkey("KMD", _PUBKEY) == "RKxTdfmtxtfLDKZBgx6SvNkBtNu9jRYnLh"
+	# DOC shares KMD's prefixes; repeated lookups must not leak params between coins
+	assert calc_addr_from_pubkey("DOC", _PUBKEY) == "RKxTdfmtxtfLDKZBgx6SvNkBtNu9jRYnLh"
+	assert calc_addr_from_pubkey("BTC", _PUBKEY) == "1BgGZ9tcN4rm9KBzDn7KprQz87SZ26SAMH"
+
+
+def test_calc_addr_from_pubkey_invalid_returns_error():
+	assert "error" in calc_addr_from_pubkey("KMD", "02" + "00" * 32)
+	assert "error" in calc_addr_from_pubkey("KMD", "not-hex")
+
+
+def test_b58encode_vectors():
+	assert b58encode(b"") == ""
+	assert b58encode(b"\0\0") == "11"
+	assert b58encode(b"hello world") == "StV1DL6CwTryKyV"
+	assert b58encode(b"\0\0\x28\x7f\xb4\xcd") == "11233QC4"
+
+
+def test_hash160_matches_bitcoinlib():
+	raw = bytes.fromhex(_PUBKEY)
+	assert hash160(raw) == Hash160(raw)
+	assert hash160(raw).hex() == "751e76e8199196d454941c45d1b3a323f1433bd6"
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import closing
+from decimal import Decimal
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from app import db_monitor
+from app.db_monitor import SQLiteSwapMonitor
+from app.models import Swap
+from app.store import SwapStore
+
+
+_SCHEMA = """
+CREATE TABLE stats_swaps (
+	id INTEGER PRIMARY KEY AUTOINCREMENT,
+	maker_coin VARCHAR(255) NOT NULL,
+	taker_coin VARCHAR(255) NOT NULL,
+	uuid VARCHAR(255) NOT NULL UNIQUE,
+	started_at INTEGER NOT NULL,
+	finished_at INTEGER NOT NULL,
+	maker_amount DECIMAL NOT NULL,
+	taker_amount DECIMAL NOT NULL,
+	is_success INTEGER NOT NULL,
+	maker_coin_ticker VARCHAR(255) NOT NULL DEFAULT '',
+	maker_coin_platform VARCHAR(255) NOT NULL DEFAULT '',
+	taker_coin_ticker VARCHAR(255) NOT NULL DEFAULT '',
+	taker_coin_platform VARCHAR(255) NOT NULL DEFAULT '',
+	maker_coin_usd_price DECIMAL,
+	taker_coin_usd_price DECIMAL,
+	maker_pubkey VARCHAR(255),
+	taker_pubkey VARCHAR(255),
+	maker_gui VARCHAR(255),
+	taker_gui VARCHAR(255),
+	maker_version VARCHAR(255),
+	taker_version VARCHAR(255)
+)
+"""
+
+
+def _make_db(path: Path, finished: List[int]) -> None:
+	with sqlite3.connect(path) as conn:
+		conn.execute(_SCHEMA)
+		for i, ts in enumerate(finished):
+			conn.execute(
+				"INSERT INTO stats_swaps (maker_coin, taker_coin, uuid, started_at, finished_at, maker_amount, taker_amount, is_success, "
+				"maker_coin_ticker, taker_coin_ticker, maker_coin_usd_price, maker_pubkey, taker_pubkey) "
+				"VALUES ('KMD', 'DGB-segwit', ?, ?, ?, 1.5, 2.25, 1, 'KMD', 'dgb', 0.25, 'pkA', 'pkB')",
+				(f"u{i}", ts - 10, ts),
+			)
+
+
+def test_backfill_range_delivers_batches(tmp_path: Path):
+	db = tmp_path / "MM2.db"
+	_make_db(db, [100, 200, 300, 400])
+	batches: List[List[Swap]] = []
+	monitor = SQLiteSwapMonitor(db_path=str(db), callback=batches.append)
+	last_id = monitor.backfill_range(150, 350)
+	assert last_id == 3
+	swaps = [s for batch in batches for s in batch]
+	assert [s.uuid for s in swaps] == ["u1", "u2"]
+	s = swaps[0]
+	assert s.maker_amount == Decimal("1.5")
+	assert s.taker_amount == Decimal("2.25")
+	assert s.maker_coin_usd_price == Decimal("0.25")
+	assert s.taker_coin_usd_price is None
+	assert s.is_success is True
+	assert s.taker_coin == "DGB-segwit"
+	# The recorded ticker is kept; the upper-cased form is derived
+	assert s.taker_coin_ticker == "dgb"
+	assert s.taker_ticker_upper == "DGB"
+
+
+def test_row_timestamps_are_coerced_to_int_for_the_store(tmp_path: Path):
+	db = tmp_path / "MM2.db"
+	_make_db(db, [100])
+	with sqlite3.connect(db) as conn:
+		# Non-integral REAL timestamps keep REAL storage despite the INTEGER column affinity
+		conn.execute("UPDATE stats_swaps SET started_at = 90.5, finished_at = 100.75")
+	batches: List[List[Swap]] = []
+	monitor = SQLiteSwapMonitor(db_path=str(db), callback=batches.append)
+	monitor.backfill_range(0, 1000)
+	swap = batches[0][0]
+	assert (swap.started_at, swap.finished_at) == (90, 100)
+	assert type(swap.finished_at) is int
+	store = SwapStore()
+	assert store.upsert_swaps(batches[0]) == 1
+	assert store.stats_for_pair("KMD", "DGB", 0, 1000)["total_swaps"] == 1
+	assert store.next_expiry() == 100 + 3600
+
+
+def test_consumer_retries_failed_batch_until_delivered(tmp_path: Path, monkeypatch):
+	monkeypatch.setattr(db_monitor, "MAX_BACKOFF_SECONDS", 0.01)
+	db = tmp_path / "MM2.db"
+	_make_db(db, [100, 200])
+	delivered = threading.Event()
+	calls: List[List[str]] = []
+
+	def _flaky(batch: List[Swap]) -> None:
+		calls.append([s.uuid for s in batch])
+		if len(calls) < 3:
+			raise RuntimeError("store busy")
+		delivered.set()
+
+	monitor = SQLiteSwapMonitor(db_path=str(db), callback=_flaky, poll_interval_seconds=0.05)
+	monitor.start()
+	try:
+		assert delivered.wait(5)
+	finally:
+		monitor.stop()
+	# The same rows are redelivered after each failure, not lost
+	assert calls == [["u0", "u1"]] * 3
+
+
+def test_consumer_caps_swaps_per_callback_call(tmp_path: Path, monkeypatch):
+	monkeypatch.setattr(db_monitor, "MAX_DELIVERY_SWAPS", 2)
+	db = tmp_path / "MM2.db"
+	_make_db(db, [100, 200, 300, 400, 500])
+	delivered = threading.Event()
+	calls: List[List[str]] = []
+
+	def _on_batch(batch: List[Swap]) -> None:
+		calls.append([s.uuid for s in batch])
+		if len(calls) == 3:
+			delivered.set()
+
+	monitor = SQLiteSwapMonitor(db_path=str(db), callback=_on_batch, poll_interval_seconds=0.05)
+	monitor.start()
+	try:
+		assert delivered.wait(5)
+	finally:
+		monitor.stop()
+	# One fetched batch of five rows is split, in order, into calls of at most two swaps
+	assert calls == [["u0", "u1"], ["u2", "u3"], ["u4"]]
+
+
+def test_stop_with_full_queue_does_not_hang_or_skip_rows(tmp_path: Path, monkeypatch):
+	monkeypatch.setattr(db_monitor, "QUEUE_MAX_BATCHES", 1)
+	monkeypatch.setattr(db_monitor, "FETCH_BATCH_SIZE", 1)
+	db = tmp_path / "MM2.db"
+	_make_db(db, [100, 200, 300, 400, 500])
+	entered = threading.Event()
+	release = threading.Event()
+	delivered: List[str] = []
+
+	def _slow(batch: List[Swap]) -> None:
+		entered.set()
+		release.wait(5)
+		delivered.extend(s.uuid for s in batch)
+
+	monitor = SQLiteSwapMonitor(db_path=str(db), callback=_slow, poll_interval_seconds=0.05)
+	monitor.start()
+	assert entered.wait(5)
+	# Consumer is stuck in the callback and the queue is full: the poller is waiting to put
+	stopper = threading.Thread(target=monitor.stop)
+	stopper.start()
+	monitor._thread.join(5)
+	assert not monitor._thread.is_alive()
+	release.set()
+	stopper.join(5)
+	assert not stopper.is_alive()
+	# Whatever was queued is flushed in order, and the cursor did not move past undelivered rows
+	assert delivered == [f"u{i}" for i in range(len(delivered))]
+	assert len(delivered) >= 2
+	assert monitor._last_seen_id < 4
+
+
+def test_history_load_stops_between_fetched_batches(tmp_path: Path, monkeypatch):
+	monkeypatch.setattr(db_monitor, "FETCH_BATCH_SIZE", 1)
+	db = tmp_path / "MM2.db"
+	_make_db(db, [100, 200, 300])
+	monitor = SQLiteSwapMonitor(db_path=str(db), callback=lambda batch: None)
+	queued: List[List[str]] = []
+
+	def _sink(batch: List[Swap]) -> None:
+		# The queue never fills here, so only the between-batch check can end the read
+		queued.append([s.uuid for s in batch])
+		monitor._stop_event.set()
+
+	with closing(monitor._connect()) as conn, closing(conn.cursor()) as cur:
+		cur.execute(db_monitor.POLL_QUERY, (-1,))
+		with pytest.raises(db_monitor._MonitorStopped):
+			monitor._dispatch_batches(cur, _sink)
+	assert queued == [["u0"]]
+
+
+def test_monitor_thread_picks_up_new_commits(tmp_path: Path):
+	db = tmp_path / "MM2.db"
+	_make_db(db, [100])
+	seen = threading.Event()
+	uuids: List[str] = []
+
+	def _on_batch(batch: List[Swap]) -> None:
+		uuids.extend(s.uuid for s in batch)
+		if "late" in uuids:
+			seen.set()
+
+	monitor = SQLiteSwapMonitor(db_path=str(db), callback=_on_batch, poll_interval_seconds=0.05)
+	monitor.start()
+	try:
+		with sqlite3.connect(db) as conn:
+			conn.execute(
+				"INSERT INTO stats_swaps (maker_coin, taker_coin, uuid, started_at, finished_at, maker_amount, taker_amount, is_success) "
+				"VALUES ('KMD', 'DGB', 'late', 1, 2, 1, 1, 1)"
+			)
+		assert seen.wait(5)
+	finally:
+		monitor.stop()
+	assert uuids == ["u0", "late"]
+
+
+def test_backfill_ranges_single_pass_over_overlapping_windows(tmp_path: Path):
+	db = tmp_path / "MM2.db"
+	_make_db(db, [100, 200, 300, 400, 500])
+	batches: List[List[Swap]] = []
+	monitor = SQLiteSwapMonitor(db_path=str(db), callback=batches.append)
+	# Overlapping windows deliver each swap once; empty/inverted ranges are ignored
+	last_id = monitor.backfill_ranges([(150, 320), (250, 350), (450, 600), (700, 600)])
+	assert last_id == 5
+	assert [s.uuid for batch in batches for s in batch] == ["u1", "u2", "u4"]
+	assert monitor.backfill_ranges([]) is None
+
+
+def test_lookup_swap_pubkeys_reuses_reader_connection(tmp_path: Path):
+	db = tmp_path / "MM2.db"
+	_make_db(db, [100, 200])
+	monitor = SQLiteSwapMonitor(db_path=str(db), callback=lambda batch: None)
+	try:
+		assert monitor.lookup_swap_pubkeys("u1") == ("KMD", "dgb", "pkA", "pkB")
+		conn = monitor._lookup_conn
+		assert monitor.lookup_swap_pubkeys("missing") is None
+		assert monitor._lookup_conn is conn
+	finally:
+		monitor.stop()
+	assert monitor._lookup_conn is None
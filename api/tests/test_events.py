@@ -12,6 +12,11 @@ def test_event_matches_pair_case_insensitive_and_reversed():
 	assert ev.matches_pair("kmd", "dgb") is True
 	assert ev.matches_pair("DGB", "KMD") is True
 	assert ev.matches_pair("KMD", "BTC") is False
+	# Normalized-symbol variant skips the re-casing
+	ev = Event(name="grp_DGB", start=1, stop=2, base_coin="kmd", rel_coin="dgb", extra={})
+	assert (ev.base_symbol, ev.rel_symbol) == ("KMD", "DGB")
+	assert ev.pair_keys == ("KMD|DGB", "DGB|KMD")
+	assert ev.matches_symbols("DGB", "KMD") is True
 
 
 def test_load_events_parses_grouped_schema(tmp_path: Path):
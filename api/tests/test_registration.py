@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from app.registration import RegistrationRepo
+
+
+def _repo(tmp_path: Path) -> RegistrationRepo:
+	repo = RegistrationRepo(str(tmp_path / "reg.db"))
+	repo.ensure_schema()
+	return repo
+
+
+def _pending(repo: RegistrationRepo, moniker: str, address: str, uuid: str):
+	return repo.create_or_refresh_pending(
+		moniker=moniker, address=address, pubkey=f"pk-{address}", pubkey_hash=f"h-{address}", rego_fee=1.234, rego_uuid=uuid,
+	)
+
+
+def test_pending_registration_lifecycle(tmp_path: Path):
+	repo = _repo(tmp_path)
+	try:
+		user = _pending(repo, "alice", "RAlice", "u1")
+		assert (user.moniker, user.status, user.rego_transaction) == ("alice", "pending", None)
+		assert [u.address for u in repo.list_pending()] == ["RAlice"]
+		# Active monikers and addresses cannot be taken again
+		with pytest.raises(ValueError, match="moniker already in use"):
+			_pending(repo, "alice", "RBob", "u2")
+		with pytest.raises(ValueError, match="address already pending"):
+			_pending(repo, "alice2", "RAlice", "u3")
+		repo.set_registered(address="RAlice", txid="tx1")
+		assert repo.get_by_address("RAlice").status == "registered"
+		assert repo.list_players() == [{"moniker": "alice", "pubkey_hash": "h-RAlice"}]
+		assert repo.list_pending() == []
+	finally:
+		repo.close()
+
+
+def test_expired_registration_is_refreshed(tmp_path: Path):
+	repo = _repo(tmp_path)
+	try:
+		_pending(repo, "bob", "RBob", "u1")
+		assert repo.expire_old(-10) == 1
+		assert repo.get_by_address("RBob").status == "expired"
+		# An expired moniker is free again, and the expired address is refreshed in place
+		user = _pending(repo, "bobby", "RBob", "u2")
+		assert (user.moniker, user.status, user.rego_uuid) == ("bobby", "pending", "u2")
+		assert repo.get_by_address("RMissing") is None
+	finally:
+		repo.close()
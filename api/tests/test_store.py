@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-import time
 from decimal import Decimal
 
 from app.events import Event
-from app.models import Swap
-from app.store import SwapStore, _normalize_symbol
+from app.models import Swap, normalize_symbol
+from app.store import SwapStore
 
 
 def make_swap(
@@ -43,9 +42,11 @@ def make_swap(
 
 
 def test_normalize_symbol_prefers_ticker_and_strips_suffix():
-	assert _normalize_symbol("DGB-segwit", None) == "DGB"
-	assert _normalize_symbol("DGB-segwit", "dgb") == "DGB"
-	assert _normalize_symbol("KMD", "kmd") == "KMD"
+	assert normalize_symbol("DGB-segwit", None) == "DGB"
+	assert normalize_symbol("DGB-segwit", "dgb") == "DGB"
+	assert normalize_symbol("KMD", "kmd") == "KMD"
+	s = make_swap(1, "u1", "DGB-segwit", "KMD", finished_at=100, maker_amount=Decimal("1"), taker_amount=Decimal("1"))
+	assert (s.maker_symbol, s.taker_symbol) == ("DGB", "KMD")
 
 
 def test_upsert_and_swaps_for_event_pair_ordering():
@@ -76,9 +77,109 @@ def test_upsert_and_swaps_for_event_pair_ordering():
 	assert [r.uuid for r in rows] == ["u2", "u1"]
 
 
-def test_prune_respects_retention_and_event_windows():
+def test_upsert_swaps_batch_skips_duplicates_and_unfinished():
+	store = SwapStore()
+	s1 = make_swap(1, "u1", "KMD", "DGB", finished_at=200, maker_amount=Decimal("1"), taker_amount=Decimal("2"))
+	s2 = make_swap(2, "u2", "DGB", "KMD", finished_at=300, maker_amount=Decimal("3"), taker_amount=Decimal("4"))
+	unfinished = make_swap(3, "u3", "KMD", "DGB", finished_at=400, maker_amount=Decimal("1"), taker_amount=Decimal("1"))
+	unfinished = unfinished.model_copy(update={"finished_at": None})
+	assert store.upsert_swaps([s1, s2, s1, unfinished]) == 2
+	assert store.total_count() == 2
+	assert store.upsert_swaps([s2]) == 0
+
+
+def test_upsert_swaps_rejects_unindexable_timestamp_and_retry_stays_consistent():
+	store = SwapStore()
+	event = Event(name="E", start=100, stop=1000, base_coin="KMD", rel_coin="DGB", extra={})
+	store.set_events([event])
+	good = make_swap(1, "good", "KMD", "DGB", finished_at=200, maker_amount=Decimal("1"), taker_amount=Decimal("1"))
+	bad = make_swap(2, "bad", "KMD", "DGB", finished_at=2 ** 63, maker_amount=Decimal("1"), taker_amount=Decimal("1"))
+	assert store.upsert_swaps([bad, good]) == 1
+	# A redelivered batch adds nothing and leaves no half-indexed swap behind
+	assert store.upsert_swaps([bad, good]) == 0
+	assert store.get_swap("bad") is None
+	assert store.total_count() == 1
+	assert [s.uuid for s in store.swaps_for_event_pair(event, 0, 2 ** 62)] == ["good"]
+	assert store.stats_for_pair("KMD", "DGB", 0, 2 ** 62)["total_swaps"] == 1
+
+
+def test_set_events_builds_group_index():
+	store = SwapStore()
+	ev_a = Event(name="FEST_ARRR", start=1, stop=2, base_coin="KMD", rel_coin="ARRR", extra={"group_name": "FEST"})
+	ev_b = Event(name="FEST_DGB", start=1, stop=2, base_coin="KMD", rel_coin="DGB", extra={"group_name": "FEST"})
+	ev_c = Event(name="SOLO", start=3, stop=4, base_coin="KMD", rel_coin="LTC", extra={})
+	store.set_events([ev_a, ev_b, ev_c])
+	groups = store.get_event_groups()
+	assert list(groups) == ["FEST", "SOLO"]
+	assert [e.name for e in groups["FEST"]] == ["FEST_ARRR", "FEST_DGB"]
+	assert store.get_event_by_name("FEST_DGB") is ev_b
+	assert store.get_event_by_name("FEST") is None
+	assert store.get_group_windows() == {"FEST": (1, 2), "SOLO": (3, 4)}
+	store.set_events([])
+	assert store.get_event_groups() == {}
+
+
+def test_group_names_by_status_reclassifies_at_window_boundaries():
+	store = SwapStore()
+	store.set_events([
+		Event(name="A", start=10, stop=20, base_coin="KMD", rel_coin="DGB", extra={}),
+		Event(name="B", start=30, stop=40, base_coin="KMD", rel_coin="LTC", extra={}),
+	])
+	assert store.group_names_by_status(5) == {"complete": [], "active": [], "upcoming": ["A", "B"]}
+	assert store.group_names_by_status(10) == {"complete": [], "active": ["A"], "upcoming": ["B"]}
+	assert store.group_names_by_status(20) == {"complete": [], "active": ["A"], "upcoming": ["B"]}
+	assert store.group_names_by_status(21) == {"complete": ["A"], "active": [], "upcoming": ["B"]}
+	assert store.group_names_by_status(41) == {"complete": ["A", "B"], "active": [], "upcoming": []}
+	# Reused until a boundary is crossed; reset by set_events
+	assert store.group_names_by_status(1000) is store.group_names_by_status(2000)
+	store.set_events([])
+	assert store.group_names_by_status(1000) == {"complete": [], "active": [], "upcoming": []}
+	# A result built from windows that set_events has since replaced is never reused
+	old = store.group_names_by_status(1000)
+	windows = store._group_windows
+	store.set_events([Event(name="C", start=0, stop=5000, base_coin="KMD", rel_coin="DGB", extra={})])
+	store._group_status = (windows, 0, float("inf"), old)
+	assert store.group_names_by_status(1000) == {"complete": [], "active": ["C"], "upcoming": []}
+
+
+def test_event_pubkey_index_tracks_inserts_and_set_events():
+	store = SwapStore()
+	event = Event(name="E", start=100, stop=1000, base_coin="KMD", rel_coin="DGB", extra={})
+	before = make_swap(1, "u1", "KMD", "DGB-segwit", finished_at=200, maker_amount=Decimal("1"), taker_amount=Decimal("1"), maker_pubkey="pkA", taker_pubkey="pkB")
+	store.upsert_swap(before)
+	# Index is rebuilt from existing swaps when events are set
+	store.set_events([event])
+	assert sorted(store.event_pubkeys(event)) == ["pkA", "pkB"]
+	after = make_swap(2, "u2", "DGB", "KMD", finished_at=300, maker_amount=Decimal("1"), taker_amount=Decimal("1"), maker_pubkey="pkB", taker_pubkey="pkC")
+	outside = make_swap(3, "u3", "KMD", "DGB", finished_at=5000, maker_amount=Decimal("1"), taker_amount=Decimal("1"), maker_pubkey="pkD", taker_pubkey="pkA")
+	store.upsert_swaps([after, outside])
+	assert sorted(store.event_pubkeys(event)) == ["pkA", "pkB", "pkC"]
+	assert [s.uuid for s in store.swaps_for_event_pubkeys(event, ["pkB"])] == ["u2", "u1"]
+	assert [s.uuid for s in store.swaps_for_event_pubkeys(event, ["pkA", "pkC"])] == ["u2", "u1"]
+	assert store.swaps_for_event_pubkeys(event, ["pkD"]) == []
+	# The event's own window is served from the per-event list, newest first
+	assert [s.uuid for s in store.swaps_for_event_pair(event, event.start, event.stop)] == ["u2", "u1"]
+	assert [s.uuid for s in store.swaps_for_event_pair(event, event.start, 250)] == ["u1"]
+
+
+def test_swaps_for_event_pair_pubkey_search_indexed_and_scanned():
 	store = SwapStore()
-	now = int(time.time())
+	event = Event(name="E", start=100, stop=1000, base_coin="KMD", rel_coin="DGB", extra={})
+	store.set_events([event])
+	store.upsert_swaps([
+		make_swap(1, "u1", "KMD", "DGB", finished_at=200, maker_amount=Decimal("1"), taker_amount=Decimal("1"), maker_pubkey="02AbC", taker_pubkey="03def"),
+		make_swap(2, "u2", "DGB", "KMD", finished_at=300, maker_amount=Decimal("1"), taker_amount=Decimal("1"), maker_pubkey="03def", taker_pubkey="02xyz"),
+	])
+	# Registered window goes through the pubkey index; a narrower window scans the buckets
+	assert [s.uuid for s in store.swaps_for_event_pair(event, 100, 1000, pubkey_search="abc")] == ["u1"]
+	assert [s.uuid for s in store.swaps_for_event_pair(event, 100, 1000, pubkey_search="DEF")] == ["u2", "u1"]
+	assert [s.uuid for s in store.swaps_for_event_pair(event, 250, 1000, pubkey_search="def")] == ["u2"]
+	assert store.swaps_for_event_pair(event, 100, 1000, pubkey_search="zzz") == []
+
+
+def test_prune_respects_retention_and_event_windows():
+	now = 1_700_000_000
+	store = SwapStore(clock=lambda: now)
 	old_ts = now - 7200
 	new_ts = now - 60
 	old_swap = make_swap(1, "old", "KMD", "DGB", finished_at=old_ts, maker_amount=Decimal("1"), taker_amount=Decimal("1"))
@@ -88,16 +189,66 @@ def test_prune_respects_retention_and_event_windows():
 	# Protect old swap via event window
 	event = Event(name="E", start=old_ts - 10, stop=old_ts + 10, base_coin="KMD", rel_coin="DGB", extra={})
 	store.set_events([event])
-	removed = store.prune(now)
+	removed = store.prune()
 	assert removed == 0
 	# Remove protection and prune again; only old should be removed
 	store.set_events([])
-	removed2 = store.prune(now)
+	removed2 = store.prune()
 	assert removed2 == 1
 	assert store.get_swap("new") is not None
 	assert store.get_swap("old") is None
 
 
+def test_prune_evicts_only_expired_unprotected_and_keeps_buckets_consistent():
+	store = SwapStore()
+	store.set_retention_hours(1)
+	now = 100_000
+	event = Event(name="E", start=now - 9000, stop=now - 8000, base_coin="KMD", rel_coin="DGB", extra={})
+	store.set_events([event])
+	swaps = [
+		make_swap(1, "a", "KMD", "DGB", finished_at=now - 9500, maker_amount=Decimal("1"), taker_amount=Decimal("1")),
+		make_swap(2, "b", "KMD", "DGB", finished_at=now - 8500, maker_amount=Decimal("1"), taker_amount=Decimal("1")),  # protected
+		make_swap(3, "c", "KMD", "DGB", finished_at=now - 5000, maker_amount=Decimal("1"), taker_amount=Decimal("1")),
+		make_swap(4, "d", "KMD", "LTC", finished_at=now - 4000, maker_amount=Decimal("1"), taker_amount=Decimal("1")),
+		make_swap(5, "e", "KMD", "DGB", finished_at=now - 60, maker_amount=Decimal("1"), taker_amount=Decimal("1")),
+	]
+	store.upsert_swaps(swaps)
+	assert store.prune(now) == 3
+	assert store.prune(now) == 0
+	assert {u for u in "abcde" if store.get_swap(u)} == {"b", "e"}
+	assert store.stats_for_pair("KMD", "DGB", 0, now)["total_swaps"] == 2
+	assert store.stats_for_pair("KMD", "LTC", 0, now)["total_swaps"] == 0
+
+
+def test_stats_for_pair_sums_are_exactly_rounded():
+	store = SwapStore()
+	store.upsert_swaps([
+		make_swap(1, "u1", "KMD", "DGB", finished_at=200, maker_amount=Decimal("1e16"), taker_amount=Decimal("1")),
+		make_swap(2, "u2", "KMD", "DGB", finished_at=300, maker_amount=Decimal("1"), taker_amount=Decimal("1")),
+		make_swap(3, "u3", "KMD", "DGB", finished_at=400, maker_amount=Decimal("1"), taker_amount=Decimal("1")),
+	])
+	stats = store.stats_for_pair("kmd", "dgb", 0, 1000)
+	# A running float sum would drop both 1s against 1e16
+	assert stats["maker_amount_sum"] == f"{1e16 + 2}"
+	assert (stats["total_swaps"], stats["taker_amount_sum"]) == (3, "3.0")
+
+
+def test_next_expiry_tracks_oldest_prunable_swap():
+	store = SwapStore()
+	store.set_retention_hours(1)
+	assert store.next_expiry() is None
+	event = Event(name="E", start=0, stop=500, base_coin="KMD", rel_coin="DGB", extra={})
+	store.set_events([event])
+	store.upsert_swaps([
+		make_swap(1, "a", "KMD", "DGB", finished_at=400, maker_amount=Decimal("1"), taker_amount=Decimal("1")),  # protected
+		make_swap(2, "b", "KMD", "DGB", finished_at=2000, maker_amount=Decimal("1"), taker_amount=Decimal("1")),
+		make_swap(3, "c", "KMD", "DGB", finished_at=1000, maker_amount=Decimal("1"), taker_amount=Decimal("1")),
+	])
+	assert store.next_expiry() == 1000 + 3600
+	assert store.prune(1000 + 3600) == 1
+	assert store.next_expiry() == 2000 + 3600
+
+
 def test_aggregate_trader_metrics_basic():
 	store = SwapStore()
 	event = Event(name="E", start=0, stop=999999, base_coin="KMD", rel_coin="DGB", extra={})
@@ -129,13 +280,146 @@ def test_aggregate_trader_metrics_basic():
 	assert ranks == {1, 2}
 
 
+class _FixedPrices:
+	def __init__(self, prices: dict) -> None:
+		self.prices = prices
+
+	def register_symbols(self, symbols) -> None:
+		pass
+
+	def get_price_usd(self, symbol: str):
+		return self.prices.get(symbol.upper())
+
+
+def test_aggregate_trader_metrics_incremental_matches_scan_and_reprices():
+	store = SwapStore()
+	event = Event(name="E", start=100, stop=1000, base_coin="KMD", rel_coin="DGB", extra={})
+	store.set_events([event])
+	store.upsert_swaps([
+		# DGB side has no recorded price and is valued from the cache at read time
+		make_swap(1, "u1", "KMD", "DGB", finished_at=200, maker_amount=Decimal("10"), taker_amount=Decimal("5"), maker_pubkey="pkA", taker_pubkey="pkB", maker_usd=Decimal("2")),
+		make_swap(2, "u2", "DGB", "KMD", finished_at=300, maker_amount=Decimal("4"), taker_amount=Decimal("1"), maker_pubkey="pkB", taker_pubkey="pkC", taker_usd=Decimal("3")),
+	])
+	prices = _FixedPrices({"KMD": 1.0, "DGB": 10.0})
+	incremental = store.aggregate_trader_metrics(event, event.start, event.stop, prices)
+	# A window that differs from the event's own forces the scan path over the same swaps
+	scanned = store.aggregate_trader_metrics(event, event.start, event.stop + 1, prices)
+	assert incremental == scanned
+	by_pk = {r["pubkey"]: r for r in incremental}
+	assert by_pk["pkB"]["usd_base_value"] == 23.0
+	assert by_pk["pkB"]["usd_rel_value"] == 90.0
+	assert by_pk["pkB"]["rank"] == 1
+	assert by_pk["pkB"]["trades_as_maker"] == 1 and by_pk["pkB"]["trades_as_taker"] == 1
+	# Cache price moves are reflected without re-ingesting swaps
+	prices.prices["DGB"] = 20.0
+	again = {r["pubkey"]: r for r in store.aggregate_trader_metrics(event, event.start, event.stop, prices)}
+	assert again["pkB"]["usd_rel_value"] == 180.0
+	assert again["pkB"]["usd_rel_price"] == 20.0
+
+
+def test_event_overview_reuses_totals_until_event_changes():
+	store = SwapStore()
+	event = Event(name="E", start=100, stop=1000, base_coin="KMD", rel_coin="DGB", extra={})
+	store.set_events([event])
+	store.set_price_cache(_FixedPrices({"KMD": 1.0, "DGB": 10.0}))
+	store.upsert_swap(make_swap(1, "u1", "KMD", "DGB", finished_at=200, maker_amount=Decimal("10"), taker_amount=Decimal("5"), maker_pubkey="pkA", taker_pubkey="pkB"))
+	first = store.event_overview(event)
+	assert (first["total_trades"], first["user_count"], first["usd_total_value"]) == (1, 2, 60.0)
+	assert store.event_overview(event) == first
+	# A new swap in the window bumps the event's stamp; swaps outside it do not count
+	store.upsert_swaps([
+		make_swap(2, "u2", "DGB", "KMD", finished_at=300, maker_amount=Decimal("4"), taker_amount=Decimal("1"), maker_pubkey="pkB", taker_pubkey="pkC"),
+		make_swap(3, "u3", "DGB", "KMD", finished_at=5000, maker_amount=Decimal("4"), taker_amount=Decimal("1"), maker_pubkey="pkD", taker_pubkey="pkC"),
+	])
+	second = store.event_overview(event)
+	assert (second["total_trades"], second["user_count"]) == (2, 3)
+	assert (second["total_base_coin_volume"], second["total_rel_coin_volume"]) == ("11.0", "9.0")
 
 
+def test_aggregate_trader_metrics_counts_self_trade_once():
+	store = SwapStore()
+	event = Event(name="E", start=100, stop=1000, base_coin="KMD", rel_coin="DGB", extra={})
+	store.set_events([event])
+	store.upsert_swaps([
+		make_swap(1, "u1", "KMD", "DGB", finished_at=200, maker_amount=Decimal("10"), taker_amount=Decimal("5"), maker_pubkey="pkA", taker_pubkey="pkA"),
+		make_swap(2, "u2", "DGB", "KMD", finished_at=300, maker_amount=Decimal("4"), taker_amount=Decimal("1"), maker_pubkey="pkB", taker_pubkey="pkA"),
+	])
+	prices = _FixedPrices({"KMD": 1.0, "DGB": 10.0})
+	for rows in (store.aggregate_trader_metrics(event, event.start, event.stop, prices), store.aggregate_trader_metrics(event, event.start, event.stop + 1, prices)):
+		pk_a = {r["pubkey"]: r for r in rows}["pkA"]
+		assert (pk_a["trades_total"], pk_a["trades_as_maker"], pk_a["trades_as_taker"]) == (2, 1, 1)
+		assert (pk_a["base_coin_volume"], pk_a["rel_coin_volume"]) == (11.0, 9.0)
 
 
+def test_aggregate_trader_metrics_top_k_matches_full_ranking_prefix():
+	store = SwapStore()
+	event = Event(name="E", start=0, stop=1000, base_coin="KMD", rel_coin="DGB", extra={})
+	store.set_events([event])
+	store.upsert_swaps([
+		make_swap(i, f"u{i}", "KMD", "DGB", finished_at=100 + i, maker_amount=Decimal(i % 4 + 1), taker_amount=Decimal("1"), maker_pubkey=f"pk{i}", taker_pubkey="pkT", maker_usd=Decimal("1"), taker_usd=Decimal("1"))
+		for i in range(1, 9)
+	])
+	full = store.aggregate_trader_metrics(event, event.start, event.stop, None)
+	top = store.aggregate_trader_metrics(event, event.start, event.stop, None, top_k=3)
+	assert top == full[:3]
+	assert [r["rank"] for r in top] == [1, 2, 3]
+	# Search keeps global ranks, so top_k does not cut the ranking short
+	searched = store.aggregate_trader_metrics(event, event.start, event.stop, None, pubkey_search="pk1", top_k=1)
+	assert [r["pubkey"] for r in searched] == ["pk1"]
+	assert searched[0]["rank"] == next(r["rank"] for r in full if r["pubkey"] == "pk1")
+
+
+def test_aggregate_trader_metrics_search_ranks_match_full_ranking():
+	store = SwapStore()
+	event = Event(name="E", start=0, stop=1000, base_coin="KMD", rel_coin="DGB", extra={})
+	store.set_events([event])
+	# Repeating amounts and timestamps leave ties that must keep the full ranking's order
+	store.upsert_swaps([
+		make_swap(i, f"u{i}", "KMD", "DGB", finished_at=100 + i % 5, maker_amount=Decimal(i % 3 + 1), taker_amount=Decimal("1"), maker_pubkey=f"pk{i}", taker_pubkey=f"pk{i + 1}", maker_usd=Decimal("1"), taker_usd=Decimal("1"))
+		for i in range(80)
+	])
+	full = store.aggregate_trader_metrics(event, event.start, event.stop, None)
+	# A narrow search (counted ranks) and a wide one (sorted ranks)
+	for needle in ("pk7", "PK"):
+		searched = store.aggregate_trader_metrics(event, event.start, event.stop, None, pubkey_search=needle)
+		assert searched == [r for r in full if needle.lower() in r["pubkey"].lower()]
+
 
+def test_swap_public_dict_is_a_fresh_copy():
+	s = make_swap(1, "u1", "KMD", "DGB", finished_at=200, maker_amount=Decimal("1.5"), taker_amount=Decimal("2"))
+	first = s.to_public_dict("mh", "th")
+	first["extra"] = 1
+	second = s.to_public_dict(None, "th2")
+	assert "extra" not in second
+	assert (second["maker_pubkey_hash"], second["taker_pubkey_hash"]) == (None, "th2")
+	assert second["maker_amount"] == 1.5 and second["taker_amount"] == 2
+	assert list(second)[-2:] == ["maker_pubkey_hash", "taker_pubkey_hash"]
 
 
+def test_swap_model_copy_recomputes_cached_derived_values():
+	s = make_swap(1, "u1", "KMD", "DGB", finished_at=200, maker_amount=Decimal("1.5"), taker_amount=Decimal("2"), taker_ticker="dgb")
+	assert (s.maker_amount_float, s.taker_ticker_upper, s.to_public_dict(None, None)["finished_at"]) == (1.5, "DGB", 200)
+	c = s.model_copy(update={"maker_amount": Decimal("9"), "finished_at": 300, "taker_coin_ticker": "ltc"})
+	assert (c.maker_amount_float, c.taker_ticker_upper, c.taker_symbol) == (9.0, "LTC", "LTC")
+	assert c.to_public_dict(None, None)["finished_at"] == 300
+	# The original keeps its own cached values
+	assert (s.maker_amount_float, s.taker_symbol) == (1.5, "DGB")
 
 
+def test_time_index_orders_ties_by_uuid_and_prunes_prefix():
+	from app.store import _TimeIndex
 
+	idx = _TimeIndex()
+	for ts, uuid in [(200, "b"), (100, "z"), (200, "a"), (300, "c"), (200, "c")]:
+		idx.insert(ts, uuid, uuid.upper())
+	assert list(zip(idx.times, idx.uuids)) == [(100, "z"), (200, "a"), (200, "b"), (200, "c"), (300, "c")]
+	assert idx.window(200, 200) == (1, 4)
+	idx.discard_through(200, {"a", "c"})
+	assert idx.uuids == ["z", "b", "c"]
+	assert idx.swaps == ["Z", "B", "C"]
+	assert idx.pop_through(200) == ["z", "b"]
+	assert list(zip(idx.times, idx.uuids)) == [(300, "c")]
+	idx.insert(400, "d", "D")
+	# Whole expired prefix removed
+	idx.discard_through(300, {"c"})
+	assert list(zip(idx.times, idx.uuids, idx.swaps)) == [(400, "d", "D")]